@@ -2,38 +2,50 @@
 Testmon Multi-Project/Job Visualization Server with Extensive Logging
 """
 import secrets
+import shutil
 from flask import (
     Flask,
     request,
     session,
     redirect,
     jsonify,
+    Response,
+    stream_with_context,
     send_file,
     send_from_directory,
     g,
     has_request_context,
 )
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import BadRequest, NotFound, RequestEntityTooLarge
 import requests
 from pathlib import Path
 from flask_cors import CORS
 from dotenv import load_dotenv
 import sqlite3
 import base64
+import copy
 import json
 import os
 from typing import Optional, Dict
 from datetime import datetime
 import hashlib
+import zlib
 import logging
 import sys
+import tempfile
+import threading
 import time
 import uuid
-from functools import wraps
+from functools import lru_cache, wraps
+from contextlib import contextmanager
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 import traceback
 from urllib.parse import urlencode
-import array
 import zipfile
 import io
+import itertools
 import re
 from github import Github, GithubException
 
@@ -50,7 +62,53 @@ except ImportError:
     OPENAI_AVAILABLE = False
     OpenAI = None
 
+# orjson is optional - it speeds up JSON encoding/decoding, stdlib json otherwise
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Flask-Compress is optional - it gzip/brotli-encodes responses for clients that ask
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+    Compress = None
+
+def json_file_bytes(obj) -> bytes:
+    """Encode ``obj`` the way the server's JSON files are stored (2-space indent)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+def parse_json_bytes(data: bytes):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def write_file_atomic(path: Path, payload: bytes) -> None:
+    """Write ``payload`` in one call to a temp file and rename it over ``path``.
+
+    Readers see either the old or the new content, never a partial write.
+    No fsync: these files are rewritten on the next upload if lost. The temp
+    file is unique per call, so concurrent writers of the same path don't
+    clobber or rename away each other's temp file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
 EZMON_FP_DIR = Path(os.getenv("EZMON_FP_DIR", "./.ezmon-fp")).resolve()
+# Browser/proxy cache lifetime for snapshot files. The default of 0 still
+# lets clients revalidate with ETag/If-Modified-Since and get a 304; raise
+# it when snapshot names are never reused.
+EZMON_FP_MAX_AGE = int(os.getenv("EZMON_FP_MAX_AGE", "0"))
 CURRENT_MODEL = "gpt-4o-mini"
 
 # CI/CD Authentication Token - set via environment variable or use default for testing
@@ -124,7 +182,29 @@ log = logging.getLogger("testmon")
 # -----------------------------------------------------------------------------
 # Flask app + config
 # -----------------------------------------------------------------------------
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (jsonify, request.get_json)."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
+if COMPRESS_AVAILABLE:
+    app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+    app.config["COMPRESS_MIN_SIZE"] = 512
+    # NDJSON/streamed endpoints must keep flushing rows as they are produced.
+    app.config["COMPRESS_STREAMS"] = False
+    Compress(app)
 load_dotenv()
 app.secret_key = os.environ.get("FLASK_SECRET_KEY")
 allowed_origin = os.environ.get("ORIGIN")
@@ -191,37 +271,76 @@ def teardown_request(exc):
 # -----------------------------------------------------------------------------
 # Metadata storage with logging
 # -----------------------------------------------------------------------------
+# (stat signature, parsed dict) of the last metadata read. The file is only
+# re-parsed when its signature changes; save_metadata always swaps in a new
+# inode, so every write invalidates it.
+_metadata_cache = None
+# Serialises read-modify-write cycles on metadata.json between request
+# threads; without it two uploads can each load the same dict and the later
+# save drops the earlier one's changes. Reentrant so helpers that update
+# metadata can be called with it held.
+_metadata_lock = threading.RLock()
+
+def _metadata_signature(st: os.stat_result) -> tuple:
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
 def get_metadata() -> Dict:
-    """Load metadata about all repos and jobs"""
+    """Load metadata about all repos and jobs.
+
+    The parsed dict is cached and shared between callers until the file
+    changes on disk, so treat it as read-only; updates go through
+    get_metadata_for_update().
+    """
+    global _metadata_cache
     try:
-        if METADATA_FILE.exists():
-            log.info("metadata_read_attempt path=%s", METADATA_FILE)
-            with open(METADATA_FILE, "r") as f:
-                data = json.load(f)
-            size = METADATA_FILE.stat().st_size
-            log.info(
-                "metadata_read_success path=%s size=%s (%s)",
-                METADATA_FILE,
-                size,
-                human_bytes(size),
-            )
-            return data
-        else:
+        try:
+            st = METADATA_FILE.stat()
+        except FileNotFoundError:
             log.info("metadata_missing path=%s", METADATA_FILE)
             return {"repos": {}}
+
+        signature = _metadata_signature(st)
+        cached = _metadata_cache
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        log.info("metadata_read_attempt path=%s", METADATA_FILE)
+        data = parse_json_bytes(METADATA_FILE.read_bytes())
+        _metadata_cache = (signature, data)
+        log.info(
+            "metadata_read_success path=%s size=%s (%s)",
+            METADATA_FILE,
+            st.st_size,
+            human_bytes(st.st_size),
+        )
+        return data
     except Exception:
         log_exception("metadata_read", path=str(METADATA_FILE))
         return {"repos": {}}
 
+def get_metadata_for_update() -> Dict:
+    """Private copy of the metadata to modify and pass to save_metadata().
+
+    Call with _metadata_lock held. Readers may be iterating the shared
+    cached dict, so it is never mutated in place.
+    """
+    return copy.deepcopy(get_metadata())
+
 def save_metadata(metadata: Dict):
     """Save metadata about all repos and jobs"""
+    global _metadata_cache
     try:
         tmp = METADATA_FILE.with_suffix(".json.tmp")
         log.info("metadata_write_attempt path=%s tmp=%s", METADATA_FILE, tmp)
-        with open(tmp, "w") as f:
-            json.dump(metadata, f, indent=2)
+        payload = json_file_bytes(metadata)
+        tmp.write_bytes(payload)
+        # The rename keeps the inode, size and mtime, so the temp file's
+        # stat is the new file's signature and the next get_metadata() is
+        # served without re-reading what was just written.
+        signature = _metadata_signature(tmp.stat())
         os.replace(tmp, METADATA_FILE)  # atomic on POSIX
-        size = METADATA_FILE.stat().st_size
+        _metadata_cache = (signature, metadata)
+        size = len(payload)
         log.info(
             "metadata_write_success path=%s size=%s (%s)",
             METADATA_FILE,
@@ -235,28 +354,188 @@ def save_metadata(metadata: Dict):
 # Helper functions
 # -----------------------------------------------------------------------------
 
-def _decode_bitmap(blob) -> set:
-    try:
-        import zstandard as zstd
-        raw = zstd.ZstdDecompressor().decompress(blob)
-    except ImportError:
-        import gzip
-        raw = gzip.decompress(blob)
+STREAM_CHUNK_ITEMS = 500
+# Sent in place of the rest of a streamed body when reading its items fails
+# after the 200 has gone out.
+STREAM_ERROR_MESSAGE = "Response truncated by a server error"
+
+def stream_json_array(head: Dict, key: str, items, count_key: Optional[str] = None) -> Response:
+    """Stream ``{**head, key: [*items]}`` without building the array in memory.
 
+    Items are encoded as they are pulled from ``items`` and flushed in
+    chunks of STREAM_CHUNK_ITEMS so the socket sees a few large writes
+    rather than one per element. With ``count_key`` the number of items is
+    appended under that key once the array is closed.
+
+    If pulling an item fails mid-stream, the error is logged and the array
+    is closed early with an ``"error"`` member in place of the count, so
+    clients can tell the list is incomplete.
+    """
+    dumps = app.json.dumps
+
+    def generate():
+        opening = dumps(head)[:-1]
+        if head:
+            opening += ","
+        chunk = [opening + dumps(key) + ":["]
+        count = 0
+        try:
+            for item in items:
+                chunk.append(("," if count else "") + dumps(item))
+                count += 1
+                if len(chunk) >= STREAM_CHUNK_ITEMS:
+                    yield "".join(chunk)
+                    chunk = []
+        except Exception:
+            log_exception("stream_json_array", key=key, sent=count)
+            response.stream_failed = True
+            chunk.append("]," + dumps("error") + ":" + dumps(STREAM_ERROR_MESSAGE) + "}")
+            yield "".join(chunk)
+            return
+        chunk.append("]")
+        if count_key is not None:
+            chunk.append("," + dumps(count_key) + ":" + dumps(count))
+        chunk.append("}")
+        yield "".join(chunk)
+
+    response = Response(stream_with_context(generate()), mimetype="application/json")
+    # Set once a stream fails; cached_db_response won't store the body.
+    response.stream_failed = False
+    return response
+
+def stream_ndjson(items, summary: Optional[Dict] = None) -> Response:
+    """Stream ``items`` as newline-delimited JSON, one object per line.
+
+    When ``summary`` is given it is sent as the last line with the number
+    of items added under ``count``. A failure mid-stream is logged and
+    ends the body with an ``{"error": ...}`` line instead.
+    """
+    dumps = app.json.dumps
+
+    def generate():
+        chunk = []
+        count = 0
+        try:
+            for item in items:
+                chunk.append(dumps(item) + "\n")
+                count += 1
+                if len(chunk) >= STREAM_CHUNK_ITEMS:
+                    yield "".join(chunk)
+                    chunk = []
+        except Exception:
+            log_exception("stream_ndjson", sent=count)
+            response.stream_failed = True
+            chunk.append(dumps({"error": STREAM_ERROR_MESSAGE}) + "\n")
+            yield "".join(chunk)
+            return
+        if summary is not None:
+            chunk.append(dumps({**summary, "count": count}) + "\n")
+        yield "".join(chunk)
+
+    response = Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+    response.stream_failed = False
+    return response
+
+# Cap on a gzip-encoded request body once decoded, so a small compressed
+# upload cannot expand without bound.
+MAX_DECODED_BODY_BYTES = int(os.getenv("MAX_DECODED_BODY_BYTES", str(512 * 1024 * 1024)))
+BODY_READ_CHUNK = 1 << 16
+
+def get_request_json():
+    """Parse the JSON request body, gunzipping it first if it was sent with
+    ``Content-Encoding: gzip``.
+
+    The compressed body is inflated chunk by chunk straight off the request
+    stream into one buffer, which is handed to the JSON parser as is. Each
+    decompress call is capped at what MAX_DECODED_BODY_BYTES still allows,
+    so a small, highly compressible chunk can't inflate past the limit.
+    """
+    if request.headers.get("Content-Encoding", "").lower() != "gzip":
+        return request.get_json()
+
+    buf = bytearray()
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
     try:
-        from pyroaring import BitMap
+        while chunk := request.stream.read(BODY_READ_CHUNK):
+            while chunk:
+                # One byte more than the cap is enough to know it's exceeded;
+                # input that didn't fit is fed back in from unconsumed_tail.
+                buf += inflater.decompress(chunk, MAX_DECODED_BODY_BYTES + 1 - len(buf))
+                if len(buf) > MAX_DECODED_BODY_BYTES:
+                    raise RequestEntityTooLarge()
+                if inflater.unconsumed_tail:
+                    chunk = inflater.unconsumed_tail
+                    continue
+                if not inflater.eof:
+                    break
+                # Concatenated gzip members: restart on whatever follows.
+                chunk = inflater.unused_data
+                inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        buf += inflater.flush()
+        if len(buf) > MAX_DECODED_BODY_BYTES:
+            raise RequestEntityTooLarge()
+        return parse_json_bytes(buf) if buf else None
+    except (zlib.error, ValueError) as e:
+        raise BadRequest(f"Invalid gzip-encoded JSON body: {e}")
+
+# Bitmap codecs are resolved once at import rather than on every decode;
+# endpoints decode one blob per test row.
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+    import gzip
+
+try:
+    from pyroaring import BitMap
+except ImportError:
+    BitMap = None
+    import pickle
+
+# A ZstdDecompressor must not be used from two threads at once, so each
+# request thread keeps its own.
+_zstd_local = threading.local()
+
+def _decompress_bitmap(blob) -> bytes:
+    if zstd is None:
+        return gzip.decompress(blob)
+    dctx = getattr(_zstd_local, "dctx", None)
+    if dctx is None:
+        dctx = _zstd_local.dctx = zstd.ZstdDecompressor()
+    return dctx.decompress(blob)
+
+def _decode_bitmap(blob) -> set:
+    raw = _decompress_bitmap(blob)
+    if BitMap is not None:
         return set(BitMap.deserialize(raw))
-    except ImportError:
-        import pickle
-        return pickle.loads(raw)
+    return pickle.loads(raw)
+
+def _bitmap_contains(blob, file_id: int) -> bool:
+    """Membership test without materialising the bitmap as a Python set."""
+    raw = _decompress_bitmap(blob)
+    if BitMap is not None:
+        return file_id in BitMap.deserialize(raw)
+    return file_id in pickle.loads(raw)
 
 # -----------------------------------------------------------------------------
 # Path helpers with logging
 # -----------------------------------------------------------------------------
+# Directory names are part of the on-disk layout, so the digest stays
+# sha256; only its computation is cached.
+@lru_cache(maxsize=4096)
+def _safe_repo_id(repo_id: str) -> str:
+    return hashlib.sha256(repo_id.encode()).hexdigest()[:16]
+
+# Data directories already seen to exist; they are never removed while the
+# server runs, so the exists() probe is only needed once per directory.
+_known_dirs = set()
+
 def get_repo_path(repo_id: str) -> Path:
     """Get path for a repository's data directory"""
-    safe_repo_id = hashlib.sha256(repo_id.encode()).hexdigest()[:16]
+    safe_repo_id = _safe_repo_id(repo_id)
     repo_path = BASE_DATA_DIR / safe_repo_id
+    if repo_path in _known_dirs:
+        return repo_path
     if not repo_path.exists():
         log.info(
             "repo_dir_create_attempt repo_id=%s safe_repo=%s path=%s",
@@ -266,6 +545,7 @@ def get_repo_path(repo_id: str) -> Path:
         )
         repo_path.mkdir(parents=True, exist_ok=True)
         log.info("repo_dir_create_success path=%s", repo_path)
+    _known_dirs.add(repo_path)
     return repo_path
 
 def get_job_db_path(repo_id: str, job_id: str) -> Path:
@@ -273,7 +553,7 @@ def get_job_db_path(repo_id: str, job_id: str) -> Path:
     repo_path = get_repo_path(repo_id)
     safe_job_id = "".join(c for c in job_id if c.isalnum() or c in ("-", "_"))
     job_path = repo_path / safe_job_id
-    if not job_path.exists():
+    if job_path not in _known_dirs and not job_path.exists():
         log.info(
             "job_dir_create_attempt repo_id=%s job_id=%s safe_job_id=%s path=%s",
             repo_id,
@@ -283,10 +563,47 @@ def get_job_db_path(repo_id: str, job_id: str) -> Path:
         )
         job_path.mkdir(parents=True, exist_ok=True)
         log.info("job_dir_create_success path=%s", job_path)
+    _known_dirs.add(job_path)
     db_path = job_path / ".testmondata"
     log.info("job_db_resolve repo_id=%s job_id=%s db_path=%s", repo_id, job_id, db_path)
     return db_path
 
+def remove_db_sidecars(db_path: Path):
+    """Delete the -wal/-shm files belonging to a DB that is being replaced.
+
+    A leftover WAL would otherwise be replayed on top of the new file the
+    next time it is opened.
+    """
+    for suffix in ("-wal", "-shm"):
+        db_path.with_name(db_path.name + suffix).unlink(missing_ok=True)
+
+def get_view_db_path(db_path: Path) -> Path:
+    """Path of the viewer's private, indexed copy of a job DB."""
+    return db_path.with_name(db_path.name + ".view")
+
+# Copy buffer for uploaded files. Werkzeug spools request files to an
+# anonymous temp file, so there is no path to rename; a large buffer keeps
+# the copy to a handful of syscalls instead of FileStorage's 16 KiB default.
+UPLOAD_COPY_BUFFER = 1 << 20
+
+def save_upload(file, dest: Path) -> Path:
+    """Write an uploaded file to a temp path beside ``dest`` and return it.
+
+    The caller moves it into place with ``os.replace`` so readers never see
+    a partially written file, and unlinks it if it never gets there. Every
+    call gets its own temp file, so concurrent uploads to one job can't
+    interleave their writes or rename each other's file away.
+    """
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=dest.name + ".", suffix=".upload")
+    tmp_path = Path(tmp)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            file.save(out, buffer_size=UPLOAD_COPY_BUFFER)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path
+
 def register_repo_job(repo_id: str, job_id: str, repo_name: Optional[str] = None):
     """Register a new repo/job combination in metadata"""
     try:
@@ -296,25 +613,31 @@ def register_repo_job(repo_id: str, job_id: str, repo_name: Optional[str] = None
             job_id,
             repo_name,
         )
-        metadata = get_metadata()
-
-        if repo_id not in metadata["repos"]:
-            metadata["repos"][repo_id] = {
-                "name": repo_name or repo_id,
-                "created": now_iso(),
-                "jobs": {},
-            }
-            log.info("metadata_add_repo repo_id=%s", repo_id)
-
-        if job_id not in metadata["repos"][repo_id]["jobs"]:
-            metadata["repos"][repo_id]["jobs"][job_id] = {
-                "created": now_iso(),
-                "last_updated": now_iso(),
-                "upload_count": 0,
-            }
-            log.info("metadata_add_job repo_id=%s job_id=%s", repo_id, job_id)
+        with _metadata_lock:
+            metadata = get_metadata_for_update()
+            changed = False
+
+            if repo_id not in metadata["repos"]:
+                metadata["repos"][repo_id] = {
+                    "name": repo_name or repo_id,
+                    "created": now_iso(),
+                    "jobs": {},
+                }
+                changed = True
+                log.info("metadata_add_repo repo_id=%s", repo_id)
+
+            if job_id not in metadata["repos"][repo_id]["jobs"]:
+                metadata["repos"][repo_id]["jobs"][job_id] = {
+                    "created": now_iso(),
+                    "last_updated": now_iso(),
+                    "upload_count": 0,
+                }
+                changed = True
+                log.info("metadata_add_job repo_id=%s job_id=%s", repo_id, job_id)
 
-        save_metadata(metadata)
+            # Already-known jobs are the common case; skip rewriting the file.
+            if changed:
+                save_metadata(metadata)
     except Exception:
         log_exception("register_repo_job", repo_id=repo_id, job_id=job_id)
 
@@ -382,6 +705,11 @@ def leverage_ai_model():
     )
     print(f"\nConnecting to {CURRENT_MODEL}... \n")
 
+    # Callers that can read a text stream ask for it with "stream": true (or
+    # ?stream=1) and get the YAML as the model produces it; the default
+    # stays one JSON object with the whole result.
+    stream = data.get("stream") is True or request.args.get("stream") == "1"
+
     try:
         response = client.chat.completions.create(
             messages=[
@@ -391,9 +719,21 @@ def leverage_ai_model():
             model=CURRENT_MODEL,
             temperature=0.1,
             max_tokens=4096,
-            stream=False
+            stream=stream
         )
 
+        if stream:
+            def generate():
+                try:
+                    for chunk in response:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                except Exception as e:
+                    # Headers are already sent; all we can do is log.
+                    print(f"AI Error: {e}")
+
+            return Response(stream_with_context(generate()), mimetype="text/plain")
+
         updated_content = response.choices[0].message.content
         return jsonify({"content": updated_content})
 
@@ -404,18 +744,152 @@ def leverage_ai_model():
 # -----------------------------------------------------------------------------
 # SQLite with logging
 # -----------------------------------------------------------------------------
-def get_db_connection(db_path: Path, readonly: bool = True):
+# Per-connection prepared statement cache (sqlite3 default is 128). The
+# endpoints only pass constant SQL text, so a long-lived connection reuses
+# the compiled statements instead of re-parsing them.
+DB_CACHED_STATEMENTS = 256
+
+# Read connections map the DB instead of pread()ing it, get a larger page
+# cache than the 2 MB default, keep sorter/temp B-trees in memory, and
+# refuse writes outright. Uploads replace job DBs by rename rather than
+# truncating them in place, so a mapping held by an in-flight reader stays
+# valid.
+READONLY_PRAGMAS = (
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA query_only=1",
+)
+
+def get_db_connection(db_path: Path, readonly: bool = True, check_same_thread: bool = True,
+                      factory=sqlite3.Connection):
     mode = "ro" if readonly else "rwc"
     abs_path = os.path.abspath(str(db_path))
     log.info("db_connect_attempt path=%s abs_path=%s readonly=%s", db_path, abs_path, readonly)
     try:
-        conn = sqlite3.connect(f"file:{abs_path}?mode={mode}", uri=True, timeout=60)
+        conn = sqlite3.connect(
+            f"file:{abs_path}?mode={mode}",
+            uri=True,
+            timeout=60,
+            cached_statements=DB_CACHED_STATEMENTS,
+            check_same_thread=check_same_thread,
+            factory=factory,
+        )
+        if readonly:
+            for pragma in READONLY_PRAGMAS:
+                conn.execute(pragma)
         log.info("db_connect_success path=%s", db_path)
         return conn
     except Exception:
         log_exception("db_connect", path=abs_path, readonly=readonly, mode=mode)
         raise
 
+# Idle read-only connections per job DB, so a request reuses an open handle
+# (and its warm page cache) instead of reopening the file. Each entry is
+# stamped with the file's identity; an upload replaces the file, which
+# retires every connection opened against the old one.
+RO_POOL_SIZE = min(8, os.cpu_count() or 1)
+# Job DBs with idle connections kept open; the least recently used one is
+# closed out beyond this to bound open file descriptors.
+RO_POOL_MAX_DBS = 64
+_ro_pools: "OrderedDict[str, tuple]" = OrderedDict()
+_ro_pools_lock = threading.Lock()
+
+class PooledConnection(sqlite3.Connection):
+    """Connection that remembers which pool entry it was opened for."""
+    pool_key = None
+
+def _db_file_signature(db_path: str) -> tuple:
+    st = os.stat(db_path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def checkout_ro_connection(db_path: Path) -> PooledConnection:
+    """Take a read-only connection to ``db_path`` from the pool, opening one if none is idle.
+
+    Raises FileNotFoundError if the DB does not exist; any other failure
+    to open it surfaces as the sqlite3 error.
+    """
+    key = os.path.abspath(str(db_path))
+    signature = _db_file_signature(key)
+
+    stale = []
+    conn = None
+    with _ro_pools_lock:
+        entry = _ro_pools.get(key)
+        if entry is not None and entry[0] != signature:
+            stale.extend(entry[1])
+            entry = None
+        if entry is None:
+            entry = _ro_pools[key] = (signature, [])
+            while len(_ro_pools) > RO_POOL_MAX_DBS:
+                _, (_, evicted) = _ro_pools.popitem(last=False)
+                stale.extend(evicted)
+        _ro_pools.move_to_end(key)
+        if entry[1]:
+            conn = entry[1].pop()
+    for old in stale:
+        old.close()
+
+    if conn is None:
+        try:
+            conn = get_db_connection(
+                key, readonly=True, check_same_thread=False, factory=PooledConnection
+            )
+        except sqlite3.OperationalError:
+            # Removed between the stat and the open.
+            if not os.path.exists(key):
+                raise FileNotFoundError(key) from None
+            raise
+        conn.pool_key = (key, signature)
+    conn.row_factory = None
+    return conn
+
+def release_ro_connection(conn: PooledConnection) -> None:
+    """Hand a connection from checkout_ro_connection back to the pool."""
+    key, signature = conn.pool_key
+    # Endpoints may switch to sqlite3.Row; hand the next borrower plain tuples.
+    conn.row_factory = None
+    with _ro_pools_lock:
+        entry = _ro_pools.get(key)
+        if entry is not None and entry[0] == signature and len(entry[1]) < RO_POOL_SIZE:
+            entry[1].append(conn)
+            return
+    conn.close()
+
+def retire_ro_connections(db_path: Path) -> None:
+    """Close the idle pooled connections to ``db_path`` and drop its entry.
+
+    Called before an upload swaps the file and removes its -wal/-shm, so
+    no pooled handle stays attached to them. Connections checked out at
+    that moment find their entry gone and are closed on release.
+    """
+    key = os.path.abspath(str(db_path))
+    with _ro_pools_lock:
+        entry = _ro_pools.pop(key, None)
+    if entry is not None:
+        for conn in entry[1]:
+            conn.close()
+
+def checkout_view_connection(db_path: Path) -> PooledConnection:
+    """Take a read-only connection for the viewer endpoints of a job DB.
+
+    Reads go to the indexed copy once ensure_server_indexes has built it,
+    and to the uploaded file until then.
+    """
+    view_path = get_view_db_path(db_path)
+    try:
+        return checkout_ro_connection(view_path)
+    except FileNotFoundError:
+        return checkout_ro_connection(db_path)
+
+@contextmanager
+def ro_connection(db_path: Path):
+    conn = checkout_ro_connection(db_path)
+    try:
+        yield conn
+    finally:
+        release_ro_connection(conn)
+
 # -----------------------------------------------------------------------------
 # API ENDPOINTS - Client Operations (GitHub Actions)
 # -----------------------------------------------------------------------------
@@ -424,6 +898,57 @@ CALLBACK = os.environ.get("GITHUB_OAUTH_CALLBACK")
 FRONTEND_URL = os.environ.get("FRONTEND_URL")
 CLIENT_SECRET = os.environ.get("GITHUB_CLIENT_SECRET")
 
+# One keep-alive session for GitHub API calls so concurrent and repeated
+# requests reuse TLS connections, plus a pool to issue independent GitHub
+# requests (workflow file checks, repo list pages) side by side.
+GITHUB_FETCH_WORKERS = 16
+github_http = requests.Session()
+github_http.mount(
+    "https://",
+    requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=GITHUB_FETCH_WORKERS),
+)
+_github_executor = ThreadPoolExecutor(
+    max_workers=GITHUB_FETCH_WORKERS, thread_name_prefix="github"
+)
+
+# Last 200 response per (url, params, token) with its ETag. GitHub answers a
+# matching If-None-Match with a bodiless 304 that doesn't count against the
+# rate limit, in which case the stored response is handed back instead.
+GITHUB_ETAG_CACHE_MAX = 512
+_github_etag_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_github_etag_lock = threading.Lock()
+
+def github_get(url: str, headers: Dict, params: Optional[Dict] = None, timeout: float = 15):
+    """GET a GitHub API URL, revalidating a previously seen response by ETag."""
+    auth = headers.get("Authorization", "")
+    key = (
+        url,
+        tuple(sorted((params or {}).items())),
+        headers.get("Accept"),
+        hashlib.sha256(auth.encode()).hexdigest(),
+    )
+    with _github_etag_lock:
+        cached = _github_etag_cache.get(key)
+    request_headers = headers
+    if cached is not None:
+        request_headers = {**headers, "If-None-Match": cached[0]}
+
+    resp = github_http.get(url, headers=request_headers, params=params, timeout=timeout)
+    if resp.status_code == 304 and cached is not None:
+        with _github_etag_lock:
+            if key in _github_etag_cache:
+                _github_etag_cache.move_to_end(key)
+        return cached[1]
+
+    etag = resp.headers.get("ETag")
+    if resp.status_code == 200 and etag:
+        with _github_etag_lock:
+            _github_etag_cache[key] = (etag, resp)
+            _github_etag_cache.move_to_end(key)
+            while len(_github_etag_cache) > GITHUB_ETAG_CACHE_MAX:
+                _github_etag_cache.popitem(last=False)
+    return resp
+
 def login_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -495,15 +1020,34 @@ def logout():
     session.clear()
     return jsonify({"message": "Logged out"})
 
+# Upload-time writers touch a freshly replaced file nobody else writes to,
+# so they can skip the per-commit fsync and keep temp data in memory.
+READWRITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+)
+
+def _open_rw(db_path) -> sqlite3.Connection:
+    conn = get_db_connection(db_path, readonly=False)
+    for pragma in READWRITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
 def add_run_id_to_testmon_data(db_path, run_id):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    conn = _open_rw(db_path)
     try:
-        cursor.execute(
-            "UPDATE run_uid SET repo_run_id=? WHERE repo_run_id IS NULL",
-            (run_id,)
-        )
-        conn.commit()
+        # Only legacy DBs carry a run_uid table; schema v21 tracks runs in
+        # `runs`, so skip the write transaction (and the error log) there.
+        if conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='run_uid'"
+        ).fetchone() is None:
+            return
+        with conn:
+            conn.execute(
+                "UPDATE run_uid SET repo_run_id=? WHERE repo_run_id IS NULL",
+                (run_id,)
+            )
 
     except Exception as e:
         log.error("Error updating run_ids for file %s: %s", db_path, e)
@@ -511,10 +1055,138 @@ def add_run_id_to_testmon_data(db_path, run_id):
     finally:
         conn.close()
 
+# Read-side indexes the viewer relies on but the plugin doesn't create. They
+# are built in the viewer's copy of the DB only, never in the uploaded file
+# the plugin downloads again. The
+# history queries pick the latest row per id at or before a run
+# (ROW_NUMBER() OVER (PARTITION BY id ORDER BY run_id DESC)); an index in
+# that order replaces the temp B-tree sort, and including the filtered
+# columns makes the small tables index-only. test_deps_history carries the
+# bitmaps, so it only gets the ordering.
+SERVER_INDEX_STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS ezviz_tests_failed_history_test_run "
+    "ON tests_failed_history (test_id, run_id DESC, failed)",
+    "CREATE INDEX IF NOT EXISTS ezviz_files_history_file_run "
+    "ON files_history (file_id, run_id DESC, checksum, path)",
+    "CREATE INDEX IF NOT EXISTS ezviz_test_deps_history_test_run "
+    "ON test_deps_history (test_id, run_id DESC)",
+    "CREATE INDEX IF NOT EXISTS ezviz_runs_created ON runs (created_at)",
+    # list_test_files groups tests by the part of the name before '::'. The
+    # expression must match the query's text for the planner to use it; as
+    # a covering index it turns the temp B-tree GROUP BY into an ordered scan.
+    "CREATE INDEX IF NOT EXISTS ezviz_tests_file_name ON tests ("
+    "CASE WHEN instr(name, '::') > 0 THEN substr(name, 1, instr(name, '::') - 1) ELSE name END, "
+    "name, duration, failed)",
+]
+
+def ensure_server_indexes(db_path):
+    """Build the viewer's indexed copy of a freshly uploaded job DB.
+
+    The uploaded file is what /api/client/download hands back to the
+    plugin, so it is never written: the indexes and ANALYZE stats go into
+    a private copy that is renamed into place at get_view_db_path().
+    Index creation is best-effort; older DBs without the history tables
+    are still served, just without the index.
+    """
+    view_path = get_view_db_path(db_path)
+    fd, tmp = tempfile.mkstemp(dir=db_path.parent, prefix=view_path.name + ".", suffix=".tmp")
+    os.close(fd)
+    tmp_path = Path(tmp)
+    try:
+        shutil.copyfile(db_path, tmp_path)
+        conn = _open_rw(tmp_path)
+        try:
+            # Readers open the copy read-only; out of WAL mode they need no
+            # -wal/-shm files beside it.
+            conn.execute("PRAGMA journal_mode=DELETE")
+            with conn:
+                # sqlite3 only opens implicit transactions for DML; begin
+                # explicitly so the DDL and ANALYZE commit once.
+                conn.execute("BEGIN IMMEDIATE")
+                for statement in SERVER_INDEX_STATEMENTS:
+                    try:
+                        conn.execute(statement)
+                    except sqlite3.OperationalError as e:
+                        log.warning("server_index_skipped db=%s error=%s", db_path, e)
+                # Give the planner stats for the new indexes; analysis_limit
+                # bounds the cost on large uploads.
+                conn.execute("PRAGMA analysis_limit=1000")
+                conn.execute("ANALYZE")
+        finally:
+            conn.close()
+        os.replace(tmp_path, view_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+# Building the viewer copy runs off the request path: the upload answers as
+# soon as the new DB is in place and readers use it unindexed meanwhile.
+# One worker keeps the maintenance writes serialized.
+_index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ezviz-index")
+_index_jobs: Dict[Path, Future] = {}
+_index_jobs_lock = threading.Lock()
+
+def _ensure_server_indexes_logged(db_path):
+    try:
+        ensure_server_indexes(db_path)
+    except Exception:
+        log_exception("server_index_build", path=str(db_path))
+
+def schedule_server_indexes(db_path: Path) -> None:
+    with _index_jobs_lock:
+        _index_jobs[db_path] = _index_executor.submit(_ensure_server_indexes_logged, db_path)
+
+# Serializes the swap of one job DB. Scheduling the copy inside the lock
+# means the next upload always waits for it, so a copy of an older file
+# can't land after a newer one is published.
+_upload_swap_locks: Dict[Path, threading.Lock] = {}
+
+def upload_swap_lock(db_path: Path) -> threading.Lock:
+    with _index_jobs_lock:
+        return _upload_swap_locks.setdefault(db_path, threading.Lock())
+
+def wait_for_server_indexes(db_path: Path) -> None:
+    """Block until no index job is copying ``db_path``.
+
+    Called before an upload replaces the file so a pending job can't
+    publish a viewer copy of the old DB after the swap.
+    """
+    with _index_jobs_lock:
+        job = _index_jobs.pop(db_path, None)
+    if job is not None:
+        job.result()
+
+# Shared worker pool for fanning out per-job DB reads (sqlite3 releases the
+# GIL while it is on disk, so the reads overlap).
+RUN_INFO_WORKERS = 8
+_run_info_executor = ThreadPoolExecutor(
+    max_workers=RUN_INFO_WORKERS, thread_name_prefix="run-infos"
+)
+
+# db path -> (db file signature, runs list). /api/repos reads every visible
+# job's runs on each load; they only change when the DB is replaced.
+_run_infos_cache: Dict[str, tuple] = {}
+
 def get_run_infos(db_path):
-    conn = None
+    key = os.path.abspath(str(db_path))
     try:
-        conn = sqlite3.connect(db_path)
+        signature = _db_file_signature(key)
+    except FileNotFoundError:
+        return []
+    cached = _run_infos_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    try:
+        runs = _read_run_infos(db_path)
+    except Exception as e:
+        log.error("Error reading run_infos from %s: %s", db_path, e)
+        return []
+    _run_infos_cache[key] = (signature, runs)
+    return runs
+
+def _read_run_infos(db_path):
+    with ro_connection(db_path) as conn:
         cursor = conn.cursor()
 
         # Get run data with stats from run_infos table
@@ -548,13 +1220,6 @@ def get_run_infos(db_path):
         ]
         return runs
 
-    except Exception as e:
-        log.error("Error reading run_infos from %s: %s", db_path, e)
-        return []
-    finally:
-        if conn is not None:
-            conn.close()
-
 @app.route("/api/client/upload", methods=["POST"])
 def upload_testmon_data():
     file = request.files.get("file")
@@ -585,16 +1250,34 @@ def upload_testmon_data():
 
         # Attempt to write uploaded file
         log.info("file_write_attempt dest=%s", db_path)
-        file.save(db_path)
-        add_run_id_to_testmon_data(db_path, run_id)
-        size = db_path.stat().st_size
-        log.info("file_write_success dest=%s size=%s (%s)", db_path, size, human_bytes(size))
+        tmp_path = save_upload(file, db_path)
+        try:
+            # Stamp the run id while the file is still private; once
+            # published it is served to clients and never written again.
+            add_run_id_to_testmon_data(tmp_path, run_id)
+            with upload_swap_lock(db_path):
+                wait_for_server_indexes(db_path)
+                # Readers fall back to the new file until its copy is rebuilt.
+                view_path = get_view_db_path(db_path)
+                view_path.unlink(missing_ok=True)
+                retire_ro_connections(view_path)
+                retire_ro_connections(db_path)
+                remove_db_sidecars(db_path)
+                os.replace(tmp_path, db_path)
+                schedule_server_indexes(db_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        if log.isEnabledFor(logging.INFO):
+            size = db_path.stat().st_size
+            log.info("file_write_success dest=%s size=%s (%s)", db_path, size, human_bytes(size))
 
         # Update metadata
-        metadata = get_metadata()
-        metadata["repos"][repo_id]["jobs"][job_id]["last_updated"] = now_iso()
-        metadata["repos"][repo_id]["jobs"][job_id]["upload_count"] += 1
-        save_metadata(metadata)
+        with _metadata_lock:
+            metadata = get_metadata_for_update()
+            metadata["repos"][repo_id]["jobs"][job_id]["last_updated"] = now_iso()
+            metadata["repos"][repo_id]["jobs"][job_id]["upload_count"] += 1
+            save_metadata(metadata)
         log.info("upload_metadata_updated")
 
         return jsonify(
@@ -624,18 +1307,25 @@ def download_testmon_data():
     db_path = get_job_db_path(repo_id, job_id)
 
     log.info("file_read_attempt path=%s", db_path)
-    if not db_path.exists():
+    try:
+        st = db_path.stat()
+    except FileNotFoundError:
         log.warning("file_read_not_found path=%s", db_path)
         return jsonify({"error": "No data found for this repo/job"}), 404
 
     try:
-        size = db_path.stat().st_size
+        size = st.st_size
         log.info("file_read_success path=%s size=%s (%s)", db_path, size, human_bytes(size))
+        # Uploads replace the file, so size + mtime identify its content; a
+        # client re-sending the ETag for an unchanged DB gets a bodiless 304.
         return send_file(
             db_path,
             as_attachment=True,
             download_name=".testmondata",
             mimetype="application/octet-stream",
+            conditional=True,
+            etag=f"{st.st_size:x}-{st.st_mtime_ns:x}",
+            last_modified=st.st_mtime,
         )
     except Exception:
         log_exception("download_send_file", path=str(db_path))
@@ -670,20 +1360,27 @@ def upload_dependency_graph():
 
         # 2. Write File
         log.info("graph_write_attempt dest=%s", graph_path)
-        file.save(graph_path)
+        tmp_path = save_upload(file, graph_path)
+        try:
+            os.replace(tmp_path, graph_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
-        size = graph_path.stat().st_size
-        log.info("graph_write_success dest=%s size=%s (%s)", graph_path, size, human_bytes(size))
+        if log.isEnabledFor(logging.INFO):
+            size = graph_path.stat().st_size
+            log.info("graph_write_success dest=%s size=%s (%s)", graph_path, size, human_bytes(size))
 
         # 3. Update Metadata
-        metadata = get_metadata()
-        job_meta = metadata["repos"][repo_id]["jobs"][job_id]
+        with _metadata_lock:
+            metadata = get_metadata_for_update()
+            job_meta = metadata["repos"][repo_id]["jobs"][job_id]
 
-        job_meta["last_updated"] = now_iso()
-        # Add a flag or timestamp specifically for the graph so the UI knows to show the button
-        job_meta["last_graph_upload"] = now_iso()
+            job_meta["last_updated"] = now_iso()
+            # Add a flag or timestamp specifically for the graph so the UI knows to show the button
+            job_meta["last_graph_upload"] = now_iso()
 
-        save_metadata(metadata)
+            save_metadata(metadata)
         log.info("upload_graph_metadata_updated")
 
         return jsonify(
@@ -719,13 +1416,119 @@ def check_testmon_data_exists():
 # -----------------------------------------------------------------------------
 # API ENDPOINTS - Visualization Data (with DB logging)
 # -----------------------------------------------------------------------------
-def _open_db_or_404(repo_id: str, job_id: str):
+def _connect_or_404(repo_id: str, job_id: str):
+    """Open the job DB read-only, or build an error response.
+
+    Only a missing DB is a 404. Any other SQLite failure (a locked or
+    unreadable file) is a 503, since the data exists and a retry may work.
+    """
     db_path = get_job_db_path(repo_id, job_id)
     log.info("db_read_attempt path=%s", db_path)
-    if not db_path.exists():
+    try:
+        return checkout_view_connection(db_path), None, None
+    except FileNotFoundError:
         log.warning("db_missing path=%s", db_path)
         return None, jsonify({"error": "No data found"}), 404
-    return db_path, None, None
+    except sqlite3.Error:
+        log_exception("db_open", path=str(db_path))
+        return None, jsonify({"error": "Database unavailable"}), 503
+
+# Encoded bodies of successful /api/data responses, keyed by request path and
+# query string. A job DB only changes when an upload replaces it, so each
+# entry is stamped with the DB file signature and dropped once that moves on.
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_MAX_BODY = 8 * 1024 * 1024
+# Total size of all cached bodies; least recently used entries go first.
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_response_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_response_cache_bytes = 0
+_response_cache_lock = threading.Lock()
+
+def _response_cache_get(key: str, signature: tuple):
+    global _response_cache_bytes
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] != signature:
+            del _response_cache[key]
+            _response_cache_bytes -= len(entry[1])
+            return None
+        _response_cache.move_to_end(key)
+        return entry
+
+def _response_cache_put(key: str, signature: tuple, body: bytes, mimetype: str) -> None:
+    global _response_cache_bytes
+    if len(body) > RESPONSE_CACHE_MAX_BODY:
+        return
+    with _response_cache_lock:
+        old = _response_cache.pop(key, None)
+        if old is not None:
+            _response_cache_bytes -= len(old[1])
+        _response_cache[key] = (signature, body, mimetype)
+        _response_cache_bytes += len(body)
+        while (
+            len(_response_cache) > RESPONSE_CACHE_MAX_ENTRIES
+            or _response_cache_bytes > RESPONSE_CACHE_MAX_BYTES
+        ):
+            _, evicted = _response_cache.popitem(last=False)
+            _response_cache_bytes -= len(evicted[1])
+
+def cached_db_response(view):
+    """Serve repeat GETs of a job-DB endpoint from ``_response_cache``.
+
+    Only plain 200 responses are stored; streamed ones are captured as they
+    are sent, so a miss still streams to the client. Capture stops once a
+    body outgrows RESPONSE_CACHE_MAX_BODY, so an uncacheable stream isn't
+    held in memory.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        db_path = get_job_db_path(kwargs["repo_id"], kwargs["job_id"])
+        try:
+            signature = _db_file_signature(os.path.abspath(str(db_path)))
+        except FileNotFoundError:
+            return view(*args, **kwargs)
+
+        key = request.full_path
+        hit = _response_cache_get(key, signature)
+        if hit is not None:
+            return Response(hit[1], mimetype=hit[2])
+
+        resp = view(*args, **kwargs)
+        if not isinstance(resp, Response) or resp.status_code != 200:
+            return resp
+        if not resp.is_streamed:
+            _response_cache_put(key, signature, resp.get_data(), resp.mimetype)
+            return resp
+
+        inner = resp.response
+        mimetype = resp.mimetype
+
+        def capture():
+            chunks = []
+            size = 0
+            try:
+                for chunk in inner:
+                    if chunks is not None:
+                        if isinstance(chunk, str):
+                            chunk = chunk.encode()
+                        size += len(chunk)
+                        if size > RESPONSE_CACHE_MAX_BODY:
+                            chunks = None
+                        else:
+                            chunks.append(chunk)
+                    yield chunk
+            finally:
+                close = getattr(inner, "close", None)
+                if close is not None:
+                    close()
+            if chunks is not None and not getattr(resp, "stream_failed", False):
+                _response_cache_put(key, signature, b"".join(chunks), mimetype)
+
+        resp.response = capture()
+        return resp
+    return wrapper
 
 @app.route("/api/repos", methods=["GET"])
 def list_repos():
@@ -734,14 +1537,24 @@ def list_repos():
     user_repositories_set = set()
     for repo in user_repositories_dict:
         user_repositories_set.add(repo.get('full_name'))
+    visible_repos = [
+        (repo_id, repo_data)
+        for repo_id, repo_data in metadata.get("repos", {}).items()
+        if repo_data.get('name') in user_repositories_set
+    ]
+    db_paths = [
+        get_job_db_path(repo_id, job_id)
+        for repo_id, repo_data in visible_repos
+        for job_id in repo_data.get("jobs", {})
+    ]
+    # map() preserves order, so results line up with the loop below.
+    run_infos = iter(_run_info_executor.map(get_run_infos, db_paths))
+
     system_repositories = []
-    for repo_id, repo_data in metadata.get("repos", {}).items():
-        if not (repo_data.get('name') in user_repositories_set):
-            continue
+    for repo_id, repo_data in visible_repos:
         jobs = []
         for job_id, job_data in repo_data.get("jobs", {}).items():
-            db_path = get_job_db_path(repo_id, job_id)
-            runs = get_run_infos(db_path)
+            runs = next(run_infos)
             jobs.append(
                 {
                     "id": job_id,
@@ -777,20 +1590,40 @@ def list_repos():
             for repo in user_repositories_dict]
     })
 
+# token digest -> (time.monotonic() of the fetch, repos). /api/repos is
+# polled by the SPA; a short TTL spares the paginated GitHub walk on each
+# poll while still picking up new repos within a minute.
+USER_REPOS_TTL_SECONDS = 60
+USER_REPOS_CACHE_MAX = 1024
+_user_repos_cache: Dict[str, tuple] = {}
+_user_repos_lock = threading.Lock()
+
 @login_required
 def get_user_repositories():
     """Fetch only repositories the user owns or collaborates on"""
     token = session["github_token"]
+    key = hashlib.sha256(token.encode()).hexdigest()
+    now = time.monotonic()
+    with _user_repos_lock:
+        cached = _user_repos_cache.get(key)
+    if cached is not None and now - cached[0] < USER_REPOS_TTL_SECONDS:
+        return cached[1]
+
+    repos = _fetch_user_repositories(token)
+    with _user_repos_lock:
+        if len(_user_repos_cache) >= USER_REPOS_CACHE_MAX:
+            _user_repos_cache.clear()
+        _user_repos_cache[key] = (now, repos)
+    return repos
+
+def _fetch_user_repositories(token: str):
     headers = {
         "Authorization": f"Bearer {token}",
         "Accept": "application/vnd.github+json"
     }
 
-    all_repos = []
-
-    page = 1
-    while True:
-        resp = requests.get(
+    def fetch_page(page):
+        return github_get(
             "https://api.github.com/user/repos",
             headers=headers,
             params={
@@ -798,13 +1631,22 @@ def get_user_repositories():
                 "sort": "updated",
                 "per_page": 100,
                 "page": page
-            }
+            },
+            timeout=15,
         )
-        repos = resp.json()
-        if not repos:
-            break
-        all_repos.extend(repos)
-        page += 1
+
+    # The first page's Link header names the last page; the rest are
+    # fetched concurrently instead of walking until an empty page.
+    first = fetch_page(1)
+    all_repos = list(first.json() or [])
+    last_url = first.links.get("last", {}).get("url")
+    if not last_url:
+        return all_repos
+
+    match = re.search(r"[?&]page=(\d+)", last_url)
+    last_page = int(match.group(1)) if match else 1
+    for resp in _github_executor.map(fetch_page, range(2, last_page + 1)):
+        all_repos.extend(resp.json() or [])
 
     return all_repos
 
@@ -922,7 +1764,7 @@ def get_workflow_files(owner, repo):
     }
     # 1. Get the list of all workflows
     url = f"https://api.github.com/repos/{owner}/{repo}/actions/workflows"
-    resp = requests.get(url, headers=headers)
+    resp = github_get(url, headers=headers)
     if resp.status_code == 404:
         return jsonify([])
     if resp.status_code != 200:
@@ -930,13 +1772,16 @@ def get_workflow_files(owner, repo):
 
     data = resp.json()
     all_workflows = data.get('workflows', [])
-    # 2. Filter workflows: Must contain 'pytest'
-    results = []
-
+    # 2. Filter workflows: Must contain 'pytest'. The content checks are
+    # independent GETs, so they run concurrently.
     for wf in all_workflows:
-        # Fetch content and check
         print(f"Checking content of: {wf['path']}")
-        has_pytest = contains_pytest(owner, repo, wf['path'], token)
+    checks = _github_executor.map(
+        lambda wf: contains_pytest(owner, repo, wf['path'], token), all_workflows
+    )
+    results = []
+
+    for wf, has_pytest in zip(all_workflows, checks):
         results.append({
             "id": wf["id"],
             "name": wf["name"],
@@ -958,7 +1803,7 @@ def contains_pytest(owner, repo, file_path, token):
     }
 
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = github_get(url, headers=headers, timeout=10)
         if resp.status_code == 200:
             # Check if 'pytest' is in the file content
             return "pytest" in resp.text
@@ -989,7 +1834,7 @@ def get_file_content(owner, repo):
         "Accept": "application/vnd.github.v3.raw"
     }
 
-    resp = requests.get(url, headers=headers)
+    resp = github_get(url, headers=headers)
 
     if resp.status_code != 200:
         return jsonify({"error": "Could not fetch file content"}), resp.status_code
@@ -1000,12 +1845,11 @@ def get_file_content(owner, repo):
 @app.route('/api/data/<path:repo_id>/<job_id>/<run_id>/summary', methods=['GET'])
 def get_summary(repo_id: str, job_id: str, run_id: str):
     g.repo_id, g.job_id, g.run_id = repo_id, job_id, run_id
-    db_path, resp, code = _open_db_or_404(repo_id, job_id)
+    conn, resp, code = _connect_or_404(repo_id, job_id)
     if resp:
         return resp, code
 
     try:
-        conn = get_db_connection(db_path, readonly=True)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1014,20 +1858,24 @@ def get_summary(repo_id: str, job_id: str, run_id: str):
             (run_id,)
         ).fetchone()
 
+        release_ro_connection(conn)
+
+        if not run_info_row:
+            log.warning("summary_run_not_found run_id=%s", run_id)
+            return jsonify({"error": "Run not found"}), 404
+
         savings = {}
-        if run_info_row:
-            if run_info_row["tests_deselected"] is not None:
-                savings["tests_saved"] = run_info_row["tests_deselected"]
-            if run_info_row["time_saved"] is not None:
-                savings["time_saved"] = run_info_row["time_saved"]
-            if run_info_row["time_all"] is not None:
-                savings["time_all"] = run_info_row["time_all"]
-
-            test_count = run_info_row["tests_all"]
-            tests_failed = run_info_row["tests_failed"] or 0
-            create_date = run_info_row["created_at"]
+        if run_info_row["tests_deselected"] is not None:
+            savings["tests_saved"] = run_info_row["tests_deselected"]
+        if run_info_row["time_saved"] is not None:
+            savings["time_saved"] = run_info_row["time_saved"]
+        if run_info_row["time_all"] is not None:
+            savings["time_all"] = run_info_row["time_all"]
+
+        test_count = run_info_row["tests_all"]
+        tests_failed = run_info_row["tests_failed"] or 0
+        create_date = run_info_row["created_at"]
 
-        conn.close()
         log.info("summary_success tests=%s",test_count)
 
         return jsonify(
@@ -1048,17 +1896,15 @@ def get_summary(repo_id: str, job_id: str, run_id: str):
 
 
 @app.route("/api/data/<path:repo_id>/<job_id>/<run_id>/test_files", methods=["GET"])
+@cached_db_response
 def list_test_files(repo_id: str, job_id: str, run_id: str):
     g.repo_id, g.job_id, g.run_id = repo_id, job_id, run_id
 
-    db_path, resp, code = _open_db_or_404(repo_id, job_id)
+    conn, resp, code = _connect_or_404(repo_id, job_id)
     if resp:
         return resp, code
 
     try:
-        conn = get_db_connection(db_path, readonly=True)
-        conn.row_factory = sqlite3.Row
-
         query = """
             SELECT
                 CASE 
@@ -1069,8 +1915,9 @@ def list_test_files(repo_id: str, job_id: str, run_id: str):
                 COUNT(*) AS test_count,
                 SUM(duration) AS total_duration,
                 SUM(CASE WHEN failed = 1 THEN 1 ELSE 0 END) AS failed_count,
+                -- tests.name is unique and the group fixes the part before
+                -- '::', so the remainders are already distinct per group.
                 GROUP_CONCAT(
-                    DISTINCT
                     CASE 
                         WHEN instr(name, '::') > 0 
                             THEN substr(name, instr(name, '::') + 2)
@@ -1082,28 +1929,30 @@ def list_test_files(repo_id: str, job_id: str, run_id: str):
             ORDER BY file_name;
         """
 
-        test_files = conn.execute(query).fetchall()
+        # Plain tuples zipped with the column names once per query rather
+        # than a sqlite3.Row per row converted with dict().
+        cursor = conn.execute(query)
+        columns = [d[0] for d in cursor.description]
+        test_files = [dict(zip(columns, row)) for row in cursor]
 
-        conn.close()
+        release_ro_connection(conn)
 
-        return jsonify({"test_files": [dict(test) for test in test_files]})
+        return jsonify({"test_files": test_files})
 
     except Exception:
         log_exception("test_list_query", repo_id=repo_id, job_id=job_id)
         return jsonify({"error": "Failed to read test list"}), 500
 
 @app.route("/api/data/<path:repo_id>/<job_id>/<run_id>/tests", methods=["GET"])
+@cached_db_response
 def get_tests(repo_id: str, job_id: str, run_id: str):
     g.repo_id, g.job_id, g.run_id = repo_id, job_id, run_id
 
-    db_path, resp, code = _open_db_or_404(repo_id, job_id)
+    conn, resp, code = _connect_or_404(repo_id, job_id)
     if resp:
         return resp, code
 
     try:
-        conn = get_db_connection(db_path, readonly=True)
-        conn.row_factory = sqlite3.Row
-
         query = """
             WITH RankedHistory AS (
                 SELECT 
@@ -1131,14 +1980,26 @@ def get_tests(repo_id: str, job_id: str, run_id: str):
             ORDER BY rh.name
         """
 
-        tests = conn.execute(query, (run_id,)).fetchall()
-        conn.close()
+        cursor = conn.execute(query, (run_id,))
+        columns = [d[0] for d in cursor.description]
+        # Read the first page here: the query sorts before returning a row,
+        # so a failing read surfaces now, while a 500 can still be sent.
+        first_page = cursor.fetchmany(STREAM_CHUNK_ITEMS)
 
-        return jsonify({
-            "run_id": run_id,
-            "tests": [dict(test) for test in tests],
-            "count": len(tests)
-        })
+        # Rows are encoded straight off the cursor, so the full test list
+        # is never held in memory; the connection goes back once drained.
+        def rows():
+            try:
+                for test in itertools.chain(first_page, cursor):
+                    yield dict(zip(columns, test))
+            finally:
+                release_ro_connection(conn)
+
+        # ?stream=1 sends one test per line instead of a single document.
+        if request.args.get("stream") == "1":
+            return stream_ndjson(rows(), summary={"run_id": run_id})
+
+        return stream_json_array({"run_id": run_id}, "tests", rows(), count_key="count")
 
     except Exception:
         log_exception("tests_query", repo_id=repo_id, job_id=job_id)
@@ -1148,25 +2009,31 @@ def get_tests(repo_id: str, job_id: str, run_id: str):
 def get_test_details(repo_id: str, job_id: str, run_id:str, test_id: int):
     g.repo_id, g.job_id , g.run_id = repo_id, job_id, run_id
 
-    db_path, resp, code = _open_db_or_404(repo_id, job_id)
+    conn, resp, code = _connect_or_404(repo_id, job_id)
     if resp:
         return resp, code
 
     try:
-        conn = get_db_connection(db_path, readonly=True)
         conn.row_factory = sqlite3.Row
 
+        # The test row and its dependency row come back in one lookup;
+        # deps_test_id is NULL when the test has no test_deps row.
         test = conn.execute(
-            "SELECT * FROM tests WHERE id = ?", (test_id,)
+            """
+            SELECT t.id, t.name, t.duration, t.failed,
+                   d.test_id AS deps_test_id, d.file_bitmap, d.external_packages
+            FROM tests AS t
+            LEFT JOIN test_deps AS d ON d.test_id = t.id
+            WHERE t.id = ?
+            """,
+            (test_id,),
         ).fetchone()
         if not test:
-            conn.close()
+            release_ro_connection(conn)
             log.warning("test_not_found test_id=%s", test_id)
             return jsonify({"error": "Test not found"}), 404
 
-        dependency_row = conn.execute(
-            "SELECT file_bitmap, external_packages FROM test_deps WHERE test_id = ?",(test_id,)
-        ).fetchone()
+        dependency_row = test if test["deps_test_id"] is not None else None
 
         dependencies = []
         external_packages = []
@@ -1176,12 +2043,16 @@ def get_test_details(repo_id: str, job_id: str, run_id:str, test_id: int):
             file_ids = _decode_bitmap(dependency_row["file_bitmap"])
 
             if file_ids:
-                # Fetch file metadata for all dependency IDs in one query
-                placeholders = ",".join("?" * len(file_ids))
-                ids = [i for i in file_ids]
+                # Fetch file metadata for all dependency IDs in one query. The
+                # ids are bound as one JSON array so the SQL text is constant
+                # (one cached statement) and isn't capped by the host
+                # parameter limit. CROSS JOIN pins json_each as the outer
+                # loop: one rowid seek per id instead of the planner's scan
+                # of the whole files table, in ascending id order as before.
                 file_rows = conn.execute(
-                    f"SELECT id, path, checksum, fsha, file_type FROM files WHERE id IN ({placeholders})",
-                    ids
+                    "SELECT f.id, f.path, f.checksum, f.fsha, f.file_type "
+                    "FROM json_each(?) AS ids CROSS JOIN files AS f ON f.id = ids.value",
+                    (json.dumps(sorted(file_ids)),)
                 ).fetchall()
 
                 for f in file_rows:
@@ -1200,7 +2071,7 @@ def get_test_details(repo_id: str, job_id: str, run_id:str, test_id: int):
                     if p.strip()
                 ]
 
-        conn.close()
+        release_ro_connection(conn)
 
         return jsonify({
             "test": {
@@ -1218,17 +2089,15 @@ def get_test_details(repo_id: str, job_id: str, run_id:str, test_id: int):
         return jsonify({"error": "Failed to read test details"}), 500
 
 @app.route("/api/data/<path:repo_id>/<job_id>/<run_id>/files", methods=["GET"])
+@cached_db_response
 def get_files(repo_id: str, job_id: str, run_id: str):
     g.repo_id, g.job_id, g.run_id = repo_id, job_id, run_id
 
-    db_path, resp, code = _open_db_or_404(repo_id, job_id)
+    conn, resp, code = _connect_or_404(repo_id, job_id)
     if resp:
         return resp, code
 
     try:
-        conn = get_db_connection(db_path, readonly=True)
-        conn.row_factory = sqlite3.Row
-
         query = """
             SELECT path
             FROM (
@@ -1241,15 +2110,21 @@ def get_files(repo_id: str, job_id: str, run_id: str):
             ORDER BY path;
         """
 
-        rows = conn.execute(query, (run_id,)).fetchall()
-        conn.close()
+        cursor = conn.execute(query, (run_id,))
+        # As in get_tests, a failing query surfaces here rather than after
+        # the 200 has been sent.
+        first_page = cursor.fetchmany(STREAM_CHUNK_ITEMS)
 
-        files = [{"path": row["path"]} for row in rows]
+        # Plain tuples encoded straight off the cursor: no Row objects and
+        # no list of every path held in memory.
+        def rows():
+            try:
+                for (path,) in itertools.chain(first_page, cursor):
+                    yield {"path": path}
+            finally:
+                release_ro_connection(conn)
 
-        return jsonify({
-            "run_id": run_id,
-            "files": files
-        })
+        return stream_json_array({"run_id": run_id}, "files", rows())
 
     except Exception as e:
         return jsonify({
@@ -1259,15 +2134,15 @@ def get_files(repo_id: str, job_id: str, run_id: str):
 
 
 @app.route( "/api/data/<path:repo_id>/<job_id>/<run_id>/fileDetails/<path:file_name>", methods=["GET"])
+@cached_db_response
 def get_file_details(repo_id: str, job_id: str, run_id: str, file_name: str):
     g.repo_id, g.job_id , g.run_id = repo_id, job_id ,run_id
 
-    db_path, resp, code = _open_db_or_404(repo_id, job_id)
+    conn, resp, code = _connect_or_404(repo_id, job_id)
     if resp:
         return resp, code
 
     try:
-        conn = get_db_connection(db_path, readonly=True)
         conn.row_factory = sqlite3.Row
 
         file = conn.execute(
@@ -1275,33 +2150,34 @@ def get_file_details(repo_id: str, job_id: str, run_id: str, file_name: str):
         ).fetchone()
 
         if not file:
-            conn.close()
+            release_ro_connection(conn)
             log.warning("file_not_found file_name=%s", file_name)
             return jsonify({"error": "File not found"}), 404
 
+        # Pull the test columns in the same scan as the bitmaps so a hit
+        # doesn't cost a second round-trip per dependent test.
         dependency_rows = conn.execute(
-            "SELECT test_id, file_bitmap FROM test_deps"
-        ).fetchall()
+            """
+            SELECT d.test_id, d.file_bitmap, t.name, t.duration, t.failed
+            FROM test_deps d
+            JOIN tests t ON t.id = d.test_id
+            ORDER BY d.test_id
+            """
+        )
 
+        file_id = file["id"]
         affected_tests = []
         for row in dependency_rows:
-            file_ids = _decode_bitmap(row["file_bitmap"])
-            if file["id"] in file_ids:
-                test_id = row["test_id"]
-                test_info = conn.execute(
-                    "SELECT name, duration, failed FROM tests WHERE id = ?",
-                    (test_id,)
-                ).fetchone()
-                if test_info:
-                    log.info("file_test_dependency file_name=%s test_name=%s", file_name, test_info["name"])
-                    affected_tests.append({
-                        "testId": test_id,
-                        "testName": test_info["name"],
-                        "duration": test_info["duration"],
-                        "failed": test_info["failed"],
-                    })
+            if _bitmap_contains(row["file_bitmap"], file_id):
+                log.info("file_test_dependency file_name=%s test_name=%s", file_name, row["name"])
+                affected_tests.append({
+                    "testId": row["test_id"],
+                    "testName": row["name"],
+                    "duration": row["duration"],
+                    "failed": row["failed"],
+                })
 
-        conn.close()
+        release_ro_connection(conn)
 
         return jsonify({"affectedTests": affected_tests})
 
@@ -1311,13 +2187,13 @@ def get_file_details(repo_id: str, job_id: str, run_id: str, file_name: str):
 
 
 @app.route("/api/data/<path:repo_id>/<job_id>/<run_id>/fileDependencies", methods=["GET"])
+@cached_db_response
 def get_file_dependencies(repo_id: str, job_id: str, run_id: str):
-    db_path, resp, code = _open_db_or_404(repo_id, job_id)
+    conn, resp, code = _connect_or_404(repo_id, job_id)
     if resp:
         return resp, code
 
     try:
-        conn = get_db_connection(db_path, readonly=True)
         conn.row_factory = sqlite3.Row
 
         files_query = """
@@ -1337,6 +2213,9 @@ def get_file_dependencies(repo_id: str, job_id: str, run_id: str):
             for row in conn.execute(files_query, (run_id,)).fetchall()
         )
 
+        # Narrow to the tests still alive at this run before ranking the
+        # deps, so deleted tests' bitmaps never enter the window sort.
+        # Filtering whole test_id partitions leaves row numbers unchanged.
         deps_query = """
             WITH RankedTests AS (
                 SELECT test_id, failed,
@@ -1344,52 +2223,62 @@ def get_file_dependencies(repo_id: str, job_id: str, run_id: str):
                 FROM tests_failed_history
                 WHERE run_id <= ?
             ),
+            LiveTests AS (
+                SELECT test_id FROM RankedTests WHERE rn = 1 AND failed != -1
+            ),
             RankedDeps AS (
-                SELECT test_id, file_bitmap, external_packages,
+                SELECT file_bitmap, external_packages,
                        ROW_NUMBER() OVER(PARTITION BY test_id ORDER BY run_id DESC) as rn
                 FROM test_deps_history
-                WHERE run_id <= ?
+                WHERE run_id <= ? AND test_id IN (SELECT test_id FROM LiveTests)
             )
-            SELECT d.file_bitmap, d.external_packages
-            FROM RankedDeps d
-            JOIN RankedTests t ON d.test_id = t.test_id
-            WHERE d.rn = 1 AND t.rn = 1 AND t.failed != -1
+            SELECT file_bitmap, external_packages
+            FROM RankedDeps
+            WHERE rn = 1
         """
 
         dep_rows = conn.execute(deps_query, (run_id, run_id)).fetchall()
 
-        file_deps: dict[str, set[str]] = {}
-        file_ext_deps: dict[str, set[str]] = {}
-
+        # Many tests share an identical dependency bitmap; fold them per
+        # blob so each distinct set is decoded and merged once.
+        blob_pkgs: dict[bytes, set[str]] = {}
         for row in dep_rows:
             if not row["file_bitmap"]:
                 continue
+            pkgs = blob_pkgs.setdefault(row["file_bitmap"], set())
+            if row["external_packages"]:
+                pkgs.update(p.strip() for p in row["external_packages"].split(",") if p.strip())
+
+        file_deps: dict[str, set[str]] = {}
+        file_ext_deps: dict[str, set[str]] = {}
 
-            file_ids = _decode_bitmap(row["file_bitmap"])
-            paths = [id_to_path.get(i) for i in file_ids]
-            paths = [p for p in paths if p]
+        for blob, pkgs in blob_pkgs.items():
+            paths = {id_to_path.get(i) for i in _decode_bitmap(blob)}
+            paths.discard(None)
 
+            # Each file depends on every other file of the set; its own
+            # name is dropped when the response is built.
             for path in paths:
-                file_deps.setdefault(path, set()).update(p for p in paths if p != path)
+                file_deps.setdefault(path, set()).update(paths)
 
-            if row["external_packages"]:
-                pkgs = [p.strip() for p in row["external_packages"].split(",") if p.strip()]
+            if pkgs:
                 for path in paths:
                     file_ext_deps.setdefault(path, set()).update(pkgs)
 
-        conn.close()
+        release_ro_connection(conn)
 
-        return jsonify({
-            "run_id": run_id,
-            "files": [
+        return stream_json_array(
+            {"run_id": run_id},
+            "files",
+            (
                 {
                     "filename": filename,
-                    "dependencies": sorted(deps),
+                    "dependencies": sorted(deps - {filename}),
                     "external_dependencies": sorted(file_ext_deps.get(filename, set())),
                 }
                 for filename, deps in sorted(file_deps.items())
-            ]
-        })
+            ),
+        )
 
     except Exception as e:
         log_exception("file_dependencies_query", repo_id=repo_id, job_id=job_id)
@@ -1403,7 +2292,7 @@ def upload_test_preferences():
     """Store user's test preferences (which tests to always run and which to prioritize)"""
 
     # Get data from request body (JSON)
-    data = request.get_json()
+    data = get_request_json()
     repo_id = data.get("repo_id")
     job_id = data.get("job_id")
 
@@ -1444,18 +2333,18 @@ def upload_test_preferences():
             "updated_at": now_iso(),
         }
 
-        with open(preferences_path, "w") as f:
-            json.dump(preferences_data, f, indent=2)
+        write_file_atomic(preferences_path, json_file_bytes(preferences_data))
 
-        size = preferences_path.stat().st_size
-        log.info(
-            "preferences_write_success path=%s size=%s (%s) always_run=%s prioritized=%s",
-            preferences_path,
-            size,
-            human_bytes(size),
-            len(always_run_tests),
-            len(prioritized_tests)
-        )
+        if log.isEnabledFor(logging.INFO):
+            size = preferences_path.stat().st_size
+            log.info(
+                "preferences_write_success path=%s size=%s (%s) always_run=%s prioritized=%s",
+                preferences_path,
+                size,
+                human_bytes(size),
+                len(always_run_tests),
+                len(prioritized_tests)
+            )
 
         return jsonify({
             "success": True,
@@ -1497,8 +2386,7 @@ def get_test_preferences():
                 "updated_at": None,
             }), 200
 
-        with open(preferences_path, "r") as f:
-            preferences_data = json.load(f)
+        preferences_data = parse_json_bytes(preferences_path.read_bytes())
 
         # Ensure both fields exist for backward compatibility
         if "prioritized_tests" not in preferences_data:
@@ -1506,13 +2394,14 @@ def get_test_preferences():
         if "always_run_tests" not in preferences_data:
             preferences_data["always_run_tests"] = []
 
-        size = preferences_path.stat().st_size
-        log.info(
-            "preferences_read_success path=%s size=%s (%s)",
-            preferences_path,
-            size,
-            human_bytes(size)
-        )
+        if log.isEnabledFor(logging.INFO):
+            size = preferences_path.stat().st_size
+            log.info(
+                "preferences_read_success path=%s size=%s (%s)",
+                preferences_path,
+                size,
+                human_bytes(size)
+            )
 
         return jsonify(preferences_data), 200
 
@@ -1544,12 +2433,71 @@ def get_pytest_report_path(repo_id: str, job_id: str, run_id: str) -> Path:
     # Store as pytest_report_{run_id}.json in the job folder
     return job_path / f"pytest_report_{safe_run_id}.json"
 
+def get_pytest_summary_path(report_path: Path) -> Path:
+    """Path of the summary precomputed from ``report_path`` at upload time."""
+    return report_path.with_name(
+        report_path.name.replace("pytest_report_", "pytest_summary_", 1)
+    )
+
+def _compute_pytest_summary(data: Dict, repo_id: str, job_id: str, run_id: str) -> Dict:
+    """Aggregate a pytest JSON report into the /pytest-summary response."""
+    summary = data.get("summary", {})
+    tests = data.get("tests", [])
+
+    # One pass over the tests for the duration total, the per-file counts
+    # and the failure details.
+    total_duration = 0
+    test_files = {}
+    failed_tests = []
+    for test in tests:
+        total_duration += _parse_test_duration(test)
+
+        nodeid = test.get("nodeid", "")
+        file_name = nodeid.split("::", 1)[0]
+        counts = test_files.get(file_name)
+        if counts is None:
+            counts = test_files[file_name] = {"passed": 0, "failed": 0, "total": 0}
+        counts["total"] += 1
+
+        outcome = test.get("outcome")
+        if outcome == "passed":
+            counts["passed"] += 1
+        elif outcome == "failed":
+            counts["failed"] += 1
+            call = test.get("call", {})
+            failed_tests.append({
+                "nodeid": test.get("nodeid"),
+                "lineno": test.get("lineno"),
+                "message": test.get("error_message") or call.get("crash", {}).get("message"),
+                "longrepr": test.get("longrepr") or call.get("longrepr"),
+            })
+
+    return {
+        "repo_id": repo_id,
+        "job_id": job_id,
+        "run_id": run_id,
+        "created": data.get("created"),
+        "duration": data.get("duration"),
+        "exitcode": data.get("exitcode"),
+        "root": data.get("root"),
+        "summary": {
+            "passed": summary.get("passed", 0),
+            "failed": summary.get("failed", 0),
+            "total": summary.get("total", 0),
+            "collected": summary.get("collected", 0),
+        },
+        "total_test_duration": total_duration,
+        "test_files": test_files,
+        "file_count": len(test_files),
+        "failed_tests": failed_tests,
+    }
+
 
 
 @app.route("/api/client/pytest-report", methods=["POST"])
 def upload_pytest_report():
     """Store pytest JSON report from CI/CD"""
-    data = request.get_json()
+    data = get_request_json()
 
     if not data:
         log.warning("pytest_report_missing_data")
@@ -1573,27 +2521,36 @@ def upload_pytest_report():
         report_path = get_pytest_report_path(repo_id, job_id, run_id)
 
         log.info("pytest_report_write_attempt dest=%s", report_path)
-        with open(report_path, "w") as f:
-            json.dump(data, f, indent=2)
+        # Drop the old summary first so a failure below can never leave one
+        # that describes a previous report; reads recompute when it's missing.
+        summary_path = get_pytest_summary_path(report_path)
+        summary_path.unlink(missing_ok=True)
+        write_file_atomic(report_path, json_file_bytes(data))
+        write_file_atomic(
+            summary_path,
+            app.json.dumps(_compute_pytest_summary(data, repo_id, job_id, run_id)).encode(),
+        )
 
-        size = report_path.stat().st_size
-        log.info("pytest_report_write_success dest=%s size=%s (%s)",
-                 report_path, size, human_bytes(size))
+        if log.isEnabledFor(logging.INFO):
+            size = report_path.stat().st_size
+            log.info("pytest_report_write_success dest=%s size=%s (%s)",
+                     report_path, size, human_bytes(size))
 
         # Update metadata with run info
-        metadata = get_metadata()
-        if repo_id in metadata["repos"] and job_id in metadata["repos"][repo_id]["jobs"]:
-            job_meta = metadata["repos"][repo_id]["jobs"][job_id]
-            if "runs" not in job_meta:
-                job_meta["runs"] = {}
-            job_meta["runs"][run_id] = {
-                "created": now_iso(),
-                "summary": data.get("summary", {}),
-                "duration": data.get("duration"),
-                "exitcode": data.get("exitcode"),
-            }
-            job_meta["last_updated"] = now_iso()
-            save_metadata(metadata)
+        with _metadata_lock:
+            metadata = get_metadata_for_update()
+            if repo_id in metadata["repos"] and job_id in metadata["repos"][repo_id]["jobs"]:
+                job_meta = metadata["repos"][repo_id]["jobs"][job_id]
+                if "runs" not in job_meta:
+                    job_meta["runs"] = {}
+                job_meta["runs"][run_id] = {
+                    "created": now_iso(),
+                    "summary": data.get("summary", {}),
+                    "duration": data.get("duration"),
+                    "exitcode": data.get("exitcode"),
+                }
+                job_meta["last_updated"] = now_iso()
+                save_metadata(metadata)
 
         return jsonify({
             "success": True,
@@ -1628,10 +2585,11 @@ def get_pytest_report():
         return jsonify({"error": "Report not found"}), 404
 
     try:
-        with open(report_path, "r") as f:
-            data = json.load(f)
+        # The stored file is already the JSON document; hand it over as is
+        # (ETag/Last-Modified included) instead of parsing and re-encoding.
+        resp = send_file(report_path, mimetype="application/json", conditional=True)
         log.info("pytest_report_read_success path=%s", report_path)
-        return jsonify(data)
+        return resp
     except Exception:
         log_exception("pytest_report_read", path=str(report_path))
         return jsonify({"error": "Failed to read pytest report"}), 500
@@ -1649,58 +2607,14 @@ def get_pytest_summary(repo_id: str, job_id: str, run_id: str):
         return jsonify({"error": "Report not found"}), 404
 
     try:
-        with open(report_path, "r") as f:
-            data = json.load(f)
-
-        summary = data.get("summary", {})
-        tests = data.get("tests", [])
-
-        # Calculate additional metrics
-        total_duration = sum(_parse_test_duration(t) for t in tests)
-
-        # Group tests by file
-        test_files = {}
-        for test in tests:
-            nodeid = test.get("nodeid", "")
-            file_name = nodeid.split("::")[0] if "::" in nodeid else nodeid
-            if file_name not in test_files:
-                test_files[file_name] = {"passed": 0, "failed": 0, "total": 0}
-            test_files[file_name]["total"] += 1
-            if test.get("outcome") == "passed":
-                test_files[file_name]["passed"] += 1
-            elif test.get("outcome") == "failed":
-                test_files[file_name]["failed"] += 1
-
-        # Get failed test details
-        failed_tests = [
-            {
-                "nodeid": t.get("nodeid"),
-                "lineno": t.get("lineno"),
-                "message": t.get("error_message") or t.get("call", {}).get("crash", {}).get("message"),
-                "longrepr": t.get("longrepr") or t.get("call", {}).get("longrepr"),
-            }
-            for t in tests if t.get("outcome") == "failed"
-        ]
+        summary_path = get_pytest_summary_path(report_path)
+        if summary_path.exists():
+            log.info("pytest_summary_success repo=%s job=%s run=%s", repo_id, job_id, run_id)
+            return send_file(summary_path, mimetype="application/json", conditional=True)
 
-        result = {
-            "repo_id": repo_id,
-            "job_id": job_id,
-            "run_id": run_id,
-            "created": data.get("created"),
-            "duration": data.get("duration"),
-            "exitcode": data.get("exitcode"),
-            "root": data.get("root"),
-            "summary": {
-                "passed": summary.get("passed", 0),
-                "failed": summary.get("failed", 0),
-                "total": summary.get("total", 0),
-                "collected": summary.get("collected", 0),
-            },
-            "total_test_duration": total_duration,
-            "test_files": test_files,
-            "file_count": len(test_files),
-            "failed_tests": failed_tests,
-        }
+        # Reports uploaded before summaries were precomputed.
+        data = parse_json_bytes(report_path.read_bytes())
+        result = _compute_pytest_summary(data, repo_id, job_id, run_id)
 
         log.info("pytest_summary_success repo=%s job=%s run=%s", repo_id, job_id, run_id)
         return jsonify(result)
@@ -1719,17 +2633,36 @@ def _gh_headers():
     return headers
 
 
+# (db path, run_id) -> (db file signature, commit sha). A run's commit never
+# changes, but the whole DB is replaced on upload, so entries are only
+# trusted while the file is the one they were read from.
+_commit_sha_cache: Dict[tuple, tuple] = {}
+COMMIT_SHA_CACHE_MAX = 1024
+
 def _get_commit_sha_for_run(db_path, run_id: str) -> Optional[str]:
     """Look up commit_id from the testmon DB for a given run_id."""
+    key = (os.path.abspath(str(db_path)), str(run_id))
     try:
-        con = sqlite3.connect(str(db_path))
-        row = con.execute(
-            "SELECT commit_id FROM runs WHERE id = ? LIMIT 1", (run_id,)
-        ).fetchone()
-        con.close()
-        return row[0] if row and row[0] else None
+        signature = _db_file_signature(key[0])
+    except FileNotFoundError:
+        return None
+    cached = _commit_sha_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    try:
+        with ro_connection(db_path) as con:
+            row = con.execute(
+                "SELECT commit_id FROM runs WHERE id = ? LIMIT 1", (run_id,)
+            ).fetchone()
     except Exception:
         return None
+    sha = row[0] if row and row[0] else None
+
+    if len(_commit_sha_cache) >= COMMIT_SHA_CACHE_MAX:
+        _commit_sha_cache.clear()
+    _commit_sha_cache[key] = (signature, sha)
+    return sha
 
 
 def _parse_test_duration(t: dict) -> float:
@@ -1744,13 +2677,34 @@ def _parse_test_duration(t: dict) -> float:
     )
 
 
+def _pytest_test_entries(tests: list[dict]) -> list[dict]:
+    """Flatten pytest-json-report tests into the /pytest-tests row shape."""
+    entries = []
+    for t in tests:
+        outcome = t.get("outcome")
+        error_message = longrepr = None
+        if outcome == "failed":
+            call = t.get("call", {})
+            error_message = t.get("error_message") or call.get("crash", {}).get("message")
+            longrepr = t.get("longrepr") or call.get("longrepr")
+        entries.append({
+            "nodeid": t.get("nodeid"),
+            "lineno": t.get("lineno"),
+            "outcome": outcome,
+            "duration": _parse_test_duration(t),
+            "error_message": error_message,
+            "longrepr": longrepr,
+        })
+    return entries
+
+
 def _download_artifact_from_run(repo_id: str, gh_run_id: int, headers: dict) -> Optional[dict]:
     """Find and download the test-report artifact from a specific GitHub Actions run ID."""
     artifacts_url = f"https://api.github.com/repos/{repo_id}/actions/runs/{gh_run_id}/artifacts"
     art_resp = requests.get(artifacts_url, headers=headers, timeout=15)
     if not art_resp.ok:
         return None
-    artifacts = art_resp.json().get("artifacts", [])
+    artifacts = app.json.loads(art_resp.content).get("artifacts", [])
     artifact = next((a for a in artifacts if "test-report" in a["name"]), None)
     if not artifact:
         log.warning("gh_artifact_not_found repo=%s gh_run_id=%s", repo_id, gh_run_id)
@@ -1763,8 +2717,9 @@ def _download_artifact_from_run(repo_id: str, gh_run_id: int, headers: dict) ->
         json_file = next((n for n in zf.namelist() if n.endswith(".json")), None)
         if not json_file:
             return None
-        with zf.open(json_file) as f:
-            data = json.load(f)
+        # Reports can run to megabytes; parse them with the app's JSON
+        # provider (orjson when installed) straight from the bytes.
+        data = app.json.loads(zf.read(json_file))
     log.info("gh_artifact_fetched repo=%s gh_run_id=%s artifact=%s", repo_id, gh_run_id, artifact["name"])
     return data
 
@@ -1777,7 +2732,7 @@ def _fetch_pytest_report_from_github(repo_id: str, commit_sha: str) -> Optional[
         runs_url = f"https://api.github.com/repos/{repo_id}/actions/runs?head_sha={commit_sha}"
         runs_resp = requests.get(runs_url, headers=headers, timeout=15)
         runs_resp.raise_for_status()
-        workflow_runs = runs_resp.json().get("workflow_runs", [])
+        workflow_runs = app.json.loads(runs_resp.content).get("workflow_runs", [])
         if not workflow_runs:
             log.warning("gh_artifact_no_runs repo=%s sha=%s", repo_id, commit_sha)
             return None
@@ -1816,18 +2771,7 @@ def get_pytest_tests_from_url():
         if not data:
             return jsonify({"error": "No test-report artifact found"}), 404
 
-        tests = []
-        for t in data.get("tests", []):
-            outcome = t.get("outcome")
-            duration = _parse_test_duration(t)
-            tests.append({
-                "nodeid": t.get("nodeid"),
-                "lineno": t.get("lineno"),
-                "outcome": outcome,
-                "duration": duration,
-                "error_message": (t.get("error_message") or t.get("call", {}).get("crash", {}).get("message")) if outcome == "failed" else None,
-                "longrepr": (t.get("longrepr") or t.get("call", {}).get("longrepr")) if outcome == "failed" else None,
-            })
+        tests = _pytest_test_entries(data.get("tests", []))
 
         log.info("pytest_tests_from_url repo=%s gh_run_id=%s count=%s", repo_id, gh_run_id, len(tests))
         return jsonify({
@@ -1848,19 +2792,23 @@ def get_pytest_tests(repo_id: str, job_id: str, run_id: str):
     g.repo_id, g.job_id = repo_id, job_id
 
     try:
-        gh_run_id = request.args.get("gh_run_id")
+        # type=int parses in the lookup and yields None instead of raising,
+        # so a malformed id is a 400 rather than a logged 500.
+        gh_run_id = request.args.get("gh_run_id", type=int)
+        if gh_run_id is None and request.args.get("gh_run_id"):
+            return jsonify({"error": "gh_run_id must be an integer"}), 400
         commit_sha = request.args.get("commit_id")
 
         if gh_run_id:
             log.info("pytest_tests_direct_gh_run repo=%s gh_run_id=%s", repo_id, gh_run_id)
-            data = _download_artifact_from_run(repo_id, int(gh_run_id), _gh_headers())
+            data = _download_artifact_from_run(repo_id, gh_run_id, _gh_headers())
         elif commit_sha:
             log.info("pytest_tests_commit_sha repo=%s sha=%s", repo_id, commit_sha)
             data = _fetch_pytest_report_from_github(repo_id, commit_sha)
         else:
             # Last resort: look up commit SHA from DB
             db_path = get_job_db_path(repo_id, job_id)
-            commit_sha = _get_commit_sha_for_run(db_path, run_id) if db_path.exists() else None
+            commit_sha = _get_commit_sha_for_run(db_path, run_id)
             if not commit_sha:
                 log.warning("pytest_tests_no_commit repo=%s job=%s run=%s", repo_id, job_id, run_id)
                 return jsonify({"error": "No commit SHA found for this run"}), 404
@@ -1868,18 +2816,7 @@ def get_pytest_tests(repo_id: str, job_id: str, run_id: str):
         if not data:
             return jsonify({"error": "No pytest report artifact found on GitHub"}), 404
 
-        tests = []
-        for t in data.get("tests", []):
-            outcome = t.get("outcome")
-            duration = _parse_test_duration(t)
-            tests.append({
-                "nodeid": t.get("nodeid"),
-                "lineno": t.get("lineno"),
-                "outcome": outcome,
-                "duration": duration,
-                "error_message": (t.get("error_message") or t.get("call", {}).get("crash", {}).get("message")) if outcome == "failed" else None,
-                "longrepr": (t.get("longrepr") or t.get("call", {}).get("longrepr")) if outcome == "failed" else None,
-            })
+        tests = _pytest_test_entries(data.get("tests", []))
 
         log.info("pytest_tests_success count=%s", len(tests))
         return jsonify({
@@ -1958,6 +2895,29 @@ def serve_react_assets(path):
     log.info("serve_assets path=%s dir=%s", path, assets_dir)
     return send_from_directory(assets_dir, path)
 
+# Relative paths of the built client files, keyed on the dist directory's
+# identity so a rebuild (which recreates dist/) is picked up. Saves a pair
+# of stat() calls per client-side route hit.
+_dist_manifest = None
+
+def get_dist_manifest(dist_dir: Path) -> frozenset:
+    global _dist_manifest
+    try:
+        st = dist_dir.stat()
+    except FileNotFoundError:
+        return frozenset()
+    signature = (st.st_ino, st.st_mtime_ns)
+    cached = _dist_manifest
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    files = frozenset(
+        p.relative_to(dist_dir).as_posix()
+        for p in dist_dir.rglob("*")
+        if p.is_file()
+    )
+    _dist_manifest = (signature, files)
+    return files
+
 # Catch-all route for React Router (client-side routing)
 @app.route("/<path:path>")
 def serve_react_app(path):
@@ -1971,15 +2931,16 @@ def serve_react_app(path):
         return serve_ezmon_fp(path.replace('.ezmon-fp/', ''))
 
     # Check if the path is a static file in dist
-    file_path = Path(app.root_path) / 'client' / 'dist' / path
-    if file_path.exists() and file_path.is_file():
-        return send_file(file_path)
+    dist_dir = Path(app.root_path) / 'client' / 'dist'
+    dist_files = get_dist_manifest(dist_dir)
+    if path in dist_files:
+        return send_file(dist_dir / path)
 
     # Otherwise, serve index.html for React Router
-    react_index = Path(app.root_path) / 'client' / 'dist' / 'index.html'
+    react_index = dist_dir / 'index.html'
     log.info("serve_react_app path=%s", path)
 
-    if react_index.exists():
+    if 'index.html' in dist_files:
         return send_file(react_index)
     else:
         log.error("react_build_missing expected=%s", react_index)
@@ -1989,10 +2950,22 @@ def serve_react_app(path):
 # IMPACT ESTIMATION ENDPOINTS
 # -----------------------------------------------------------------------------
 
+# Probes can hit /health many times a second; reuse the repo count for a
+# moment instead of stat()ing metadata.json on every one.
+HEALTH_TTL_SECONDS = 1.0
+_health_cache = None  # (time.monotonic() of the read, repo_count)
+
 @app.route("/health")
 def health():
-    repo_count = len(get_metadata().get("repos", {}))
-    log.info("health_check repo_count=%s data_dir=%s", repo_count, BASE_DATA_DIR)
+    global _health_cache
+    now = time.monotonic()
+    cached = _health_cache
+    if cached is not None and now - cached[0] < HEALTH_TTL_SECONDS:
+        repo_count = cached[1]
+    else:
+        repo_count = len(get_metadata().get("repos", {}))
+        _health_cache = (now, repo_count)
+    log.debug("health_check repo_count=%s data_dir=%s", repo_count, BASE_DATA_DIR)
     return jsonify(
         {"status": "healthy!!!", "data_dir": str(BASE_DATA_DIR), "repo_count": repo_count}
     )
@@ -2001,15 +2974,17 @@ def health():
 def serve_ezmon_fp(subpath: str):
     # Static file bridge for the ezmon snapshots
     fp_path = EZMON_FP_DIR / subpath
-    if not fp_path.exists() or fp_path.is_dir():
+    # send_from_directory does the only stat, rejects directories and
+    # answers conditional requests with a 304.
+    try:
+        resp = send_from_directory(
+            EZMON_FP_DIR, subpath, as_attachment=False, max_age=EZMON_FP_MAX_AGE
+        )
+    except NotFound:
         log.warning("ezmon_fp_missing path=%s", fp_path)
         return jsonify({"error": "Not found"}), 404
-    try:
-        size = fp_path.stat().st_size
-    except Exception:
-        size = -1
-    log.info("ezmon_fp_serve path=%s size=%s", fp_path, size)
-    return send_from_directory(EZMON_FP_DIR, subpath, as_attachment=False)
+    log.info("ezmon_fp_serve path=%s size=%s", fp_path, resp.content_length)
+    return resp
 
 
 if __name__ == "__main__":
@@ -11,6 +11,9 @@ from ezmon.bitmap_deps import TestDeps, find_affected_tests
 
 DATA_VERSION = 21  # v20: history tables; v21: tests_failed + forced columns
 
+# UPDATE ... RETURNING needs SQLite 3.35+; older runtimes take a SELECT first.
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
 
 class TestmonDbException(Exception):
     pass
@@ -346,6 +349,14 @@ class DB:  # pylint: disable=too-many-public-methods
         try:
             if not self._readonly:
                 self.con.commit()
+                # Refresh planner stats for the tables this session touched,
+                # as SQLite recommends doing before closing a connection.
+                # analysis_limit keeps it to a bounded sample on big DBs.
+                try:
+                    self.con.execute("PRAGMA analysis_limit = 400")
+                    self.con.execute("PRAGMA optimize")
+                except sqlite3.DatabaseError:
+                    pass
                 # Merge WAL into the main DB so copied .testmondata is complete.
                 self.con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
         finally:
@@ -375,15 +386,25 @@ class DB:  # pylint: disable=too-many-public-methods
         """Fetch run statistics from the tests table."""
         with self.con as con:
             cursor = con.cursor()
-            run_all_tests, run_all_time = cursor.execute(
-                "SELECT count(*), sum(duration) FROM tests"
-            ).fetchone()
             if run_id is not None:
-                run_saved_tests, run_saved_time = cursor.execute(
-                    "SELECT count(*), sum(duration) FROM tests WHERE run_id = ?",
-                    (run_id,)
+                # Both totals in one scan of tests; the CASE arms are NULL
+                # outside the run, so count()/sum() see only its rows.
+                (
+                    run_all_tests,
+                    run_all_time,
+                    run_saved_tests,
+                    run_saved_time,
+                ) = cursor.execute(
+                    """SELECT count(*), sum(duration),
+                              count(CASE WHEN run_id = ? THEN 1 END),
+                              sum(CASE WHEN run_id = ? THEN duration END)
+                       FROM tests""",
+                    (run_id, run_id),
                 ).fetchone()
             else:
+                run_all_tests, run_all_time = cursor.execute(
+                    "SELECT count(*), sum(duration) FROM tests"
+                ).fetchone()
                 run_saved_tests, run_saved_time = run_all_tests, run_all_time
 
         return (
@@ -401,17 +422,19 @@ class DB:  # pylint: disable=too-many-public-methods
             run_all_tests,
         ) = self.fetch_current_run_stats()
         attribute_prefix = "" if select else "potential_"
-        total_saved_time = self.fetch_attribute(
-            attribute=f"{attribute_prefix}time_saved", default=0
-        )
-        total_all_time = self.fetch_attribute(
-            attribute=f"{attribute_prefix}time_all", default=0
-        )
-        total_saved_tests = self.fetch_attribute(
-            attribute=f"{attribute_prefix}tests_saved", default=0
-        )
-        total_all_tests = self.fetch_attribute(
-            attribute=f"{attribute_prefix}tests_all", default=0
+        (
+            total_saved_time,
+            total_all_time,
+            total_saved_tests,
+            total_all_tests,
+        ) = self.fetch_attributes(
+            [
+                f"{attribute_prefix}time_saved",
+                f"{attribute_prefix}time_all",
+                f"{attribute_prefix}tests_saved",
+                f"{attribute_prefix}tests_all",
+            ],
+            default=0,
         )
 
         return (
@@ -479,6 +502,20 @@ class DB:  # pylint: disable=too-many-public-methods
             return json.loads(result[0])
         return default
 
+    def fetch_attributes(self, attributes, default=None):
+        """fetch_attribute() for several keys in one query, in the given order."""
+        placeholders = ",".join("?" * len(attributes))
+        found = dict(
+            self.con.execute(
+                f"SELECT key, value FROM metadata WHERE key IN ({placeholders})",
+                list(attributes),
+            )
+        )
+        return [
+            json.loads(found[attribute]) if attribute in found else default
+            for attribute in attributes
+        ]
+
     def increment_attributes(self, attributes_to_increment):
         def sum_with_none(*to_sum):
             return sum(filter(None, to_sum))
@@ -595,15 +632,37 @@ class DB:  # pylint: disable=too-many-public-methods
         return [row["path"] for row in cursor]
 
     def delete_test_executions(self, test_names):
-        """Delete tests and their dependencies."""
-        for test_name in test_names:
-            self.delete_test(test_name)
+        """Delete tests and their dependencies.
+
+        All deletions run in one transaction, a chunk of names per
+        statement, instead of a lookup, two DELETEs and a commit per test.
+        """
+        test_names = list(test_names)
+        if not test_names:
+            return
+        # Process in chunks to avoid exceeding SQLite variable limit
+        chunk_size = 500
+        with self.con as con:
+            for i in range(0, len(test_names), chunk_size):
+                chunk = test_names[i:i + chunk_size]
+                placeholders = ",".join("?" * len(chunk))
+                con.execute(
+                    f"DELETE FROM test_deps WHERE test_id IN "
+                    f"(SELECT id FROM tests WHERE name IN ({placeholders}))",
+                    chunk,
+                )
+                con.execute(
+                    f"DELETE FROM tests WHERE name IN ({placeholders})",
+                    chunk,
+                )
 
     def all_test_executions(self):
         """Get all tests with their metadata."""
+        # Unpack rows positionally; keyed sqlite3.Row lookups cost a name
+        # search per column on what is the largest read of a session.
         return {
-            row["name"]: {"duration": row["duration"], "failed": bool(row["failed"]), "forced": row["forced"]}
-            for row in self.con.execute(
+            name: {"duration": duration, "failed": bool(failed), "forced": forced}
+            for name, duration, failed, forced in self.con.execute(
                 "SELECT name, duration, failed, forced FROM tests"
             )
         }
@@ -640,32 +699,43 @@ class DB:  # pylint: disable=too-many-public-methods
         """
         cursor = self.con.cursor()
 
-        # Try to get existing file ID
-        row = cursor.execute(
-            "SELECT id FROM files WHERE path = ?", (path,)
-        ).fetchone()
+        updates = []
+        params = []
+        if checksum is not None:
+            updates.append("checksum = ?")
+            params.append(checksum)
+        if fsha is not None:
+            updates.append("fsha = ?")
+            params.append(fsha)
+        if run_id is not None:
+            updates.append("run_id = ?")
+            params.append(run_id)
+
+        if updates and SQLITE_HAS_RETURNING:
+            # Update checksum/fsha/run_id and learn the ID in one statement.
+            # (An INSERT ... ON CONFLICT upsert would burn an AUTOINCREMENT
+            # value on every hit and spread the IDs stored in the bitmaps.)
+            row = cursor.execute(
+                f"UPDATE files SET {', '.join(updates)} WHERE path = ? RETURNING id",
+                params + [path],
+            ).fetchone()
+            if row:
+                return row[0]
+        else:
+            # Try to get existing file ID
+            row = cursor.execute(
+                "SELECT id FROM files WHERE path = ?", (path,)
+            ).fetchone()
 
-        if row:
-            file_id = row[0]
-            # Update checksum/fsha/run_id if provided
-            updates = []
-            params = []
-            if checksum is not None:
-                updates.append("checksum = ?")
-                params.append(checksum)
-            if fsha is not None:
-                updates.append("fsha = ?")
-                params.append(fsha)
-            if run_id is not None:
-                updates.append("run_id = ?")
-                params.append(run_id)
-            if updates:
-                params.append(file_id)
-                cursor.execute(
-                    f"UPDATE files SET {', '.join(updates)} WHERE id = ?",
-                    params,
-                )
-            return file_id
+            if row:
+                file_id = row[0]
+                if updates:
+                    params.append(file_id)
+                    cursor.execute(
+                        f"UPDATE files SET {', '.join(updates)} WHERE id = ?",
+                        params,
+                    )
+                return file_id
 
         # Create new file record
         cursor.execute(
@@ -941,6 +1011,26 @@ class DB:  # pylint: disable=too-many-public-methods
         )
         return [row["name"] for row in cursor]
 
+    def _get_file_rows_by_path(self, paths: list, column: str) -> Dict[str, Tuple[int, object]]:
+        """Bulk-load ``{path: (id, <column>)}`` for the given paths.
+
+        One query per chunk instead of one per path; ``column`` is one of
+        the files table's own column names, never user input.
+        """
+        result = {}
+        # Process in chunks to avoid exceeding SQLite variable limit
+        chunk_size = 500
+        for i in range(0, len(paths), chunk_size):
+            chunk = paths[i:i + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self.con.execute(
+                f"SELECT path, id, {column} FROM files WHERE path IN ({placeholders})",
+                chunk,
+            )
+            for row in cursor:
+                result[row[0]] = (row[1], row[2])
+        return result
+
     def get_changed_file_ids(
         self,
         files_checksums: Dict[str, int]
@@ -956,15 +1046,14 @@ class DB:  # pylint: disable=too-many-public-methods
             Set of file IDs whose checksums differ
         """
         changed_ids = set()
+        stored = self._get_file_rows_by_path(list(files_checksums), "checksum")
 
         for path, current_checksum in files_checksums.items():
-            row = self.con.execute(
-                "SELECT id, checksum FROM files WHERE path = ?", (path,)
-            ).fetchone()
+            row = stored.get(path)
 
             if row:
-                if row["checksum"] != current_checksum:
-                    changed_ids.add(row["id"])
+                if row[1] != current_checksum:
+                    changed_ids.add(row[0])
             # New file - it's changed by definition
             else:
                 file_id = self.get_or_create_file_id(path, current_checksum)
@@ -1025,15 +1114,14 @@ class DB:  # pylint: disable=too-many-public-methods
             Set of file IDs whose fsha differs
         """
         changed_ids = set()
+        stored = self._get_file_rows_by_path(list(file_deps_shas), "fsha")
 
         for path, current_fsha in file_deps_shas.items():
-            row = self.con.execute(
-                "SELECT id, fsha FROM files WHERE path = ?", (path,)
-            ).fetchone()
+            row = stored.get(path)
 
             if row:
-                if row["fsha"] != current_fsha:
-                    changed_ids.add(row["id"])
+                if row[1] != current_fsha:
+                    changed_ids.add(row[0])
             else:
                 # New file - get or create with data type
                 file_id = self.get_or_create_file_id(
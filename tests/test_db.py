@@ -141,6 +141,19 @@ class TestBitmapSchema:
         assert run_saved_time == 4.0
         assert run_all_time == 4.0
 
+    def test_fetch_current_run_stats_splits_by_run(self, temp_db):
+        """fetch_current_run_stats(run_id) should count only that run's tests as saved."""
+        old_run = temp_db.create_run("abc123", "packages", "3.9")
+        new_run = temp_db.create_run("def456", "packages", "3.9")
+
+        temp_db.get_or_create_test_id(test_name="test_old", duration=1.5, run_id=old_run)
+        temp_db.get_or_create_test_id(test_name="test_new", duration=2.5, run_id=new_run)
+
+        assert temp_db.fetch_current_run_stats(new_run) == (2.5, 4.0, 1, 2)
+
+        empty_run = temp_db.create_run("0ff1ce", "packages", "3.9")
+        assert temp_db.fetch_current_run_stats(empty_run) == (None, 4.0, 0, 2)
+
     def test_get_failing_tests_bitmap(self, temp_db):
         """get_failing_tests_bitmap() should return failed tests."""
         run_id = temp_db.create_run("abc123", "packages", "3.9")
@@ -181,13 +194,37 @@ class TestBitmapSchema:
         deps = temp_db.get_test_deps(test_id)
         assert deps is None
 
-    def test_get_or_create_file_id_updates_checksum(self, temp_db):
+    def test_delete_test_executions(self, temp_db):
+        """delete_test_executions() should remove only the named tests and their deps."""
+        run_id = temp_db.create_run("abc123", "packages", "3.9")
+
+        file_id = temp_db.get_or_create_file_id("src/foo.py", checksum=100, run_id=run_id)
+
+        from ezmon.bitmap_deps import TestDeps
+        test_ids = {}
+        for name in ("test_a", "test_b", "test_keep"):
+            test_id = temp_db.get_or_create_test_id(test_name=name, run_id=run_id)
+            temp_db.save_test_deps(test_id, TestDeps.from_file_ids(test_id, {file_id}, set()))
+            test_ids[name] = test_id
+
+        temp_db.delete_test_executions(["test_a", "test_b", "test_unknown"])
+
+        tests = temp_db.all_test_executions()
+        assert set(tests) == {"test_keep"}
+        assert temp_db.get_test_deps(test_ids["test_a"]) is None
+        assert temp_db.get_test_deps(test_ids["test_b"]) is None
+        assert temp_db.get_test_deps(test_ids["test_keep"]) is not None
+
+    @pytest.mark.parametrize("has_returning", [True, False])
+    def test_get_or_create_file_id_updates_checksum(self, temp_db, monkeypatch, has_returning):
         """get_or_create_file_id() should update checksum on subsequent calls."""
+        monkeypatch.setattr("ezmon.db.SQLITE_HAS_RETURNING", has_returning)
         file_id1 = temp_db.get_or_create_file_id("src/foo.py", checksum=100)
 
         file_id2 = temp_db.get_or_create_file_id("src/foo.py", checksum=200)
 
         assert file_id1 == file_id2
+        assert temp_db.get_or_create_file_id("src/foo.py") == file_id1
 
         checksums = temp_db.get_file_checksums()
         assert checksums["src/foo.py"] == 200
@@ -417,7 +454,45 @@ class TestSchemaIntegrity:
         result = temp_db.fetch_attribute("test_key")
         assert result == "test_value"
 
+    def test_fetch_attributes_keeps_order_and_default(self, temp_db):
+        """fetch_attributes() should return values in key order, default for missing keys."""
+        temp_db.write_attribute("b", 2)
+        temp_db.write_attribute("a", [1])
+
+        assert temp_db.fetch_attributes(["a", "missing", "b"], default=0) == [[1], 0, 2]
+
     def test_data_version_is_21(self, temp_db):
         """Data version should be 21 (v21: history tables + forced/tests_failed)."""
         version = temp_db.con.execute("PRAGMA user_version").fetchone()[0]
         assert version == 21
+
+
+class TestClose:
+    """Test what DB.close() leaves behind in the data file."""
+
+    def test_close_refreshes_planner_stats(self):
+        """close() runs PRAGMA optimize, so queried tables get sqlite_stat1 rows."""
+        import sqlite3
+
+        with tempfile.NamedTemporaryFile(suffix='.testmondata', delete=False) as f:
+            db_path = f.name
+        try:
+            database = DB(db_path)
+            run_id = database.create_run("abc123", "{}", "3.11")
+            for i in range(20):
+                database.get_or_create_test_id(test_name=f"test_{i}", run_id=run_id)
+            database.get_test_files_for_tests({"test_1", "test_2"})
+            database.close()
+
+            con = sqlite3.connect(db_path)
+            try:
+                analyzed = {
+                    row[0] for row in con.execute("SELECT tbl FROM sqlite_stat1")
+                }
+            finally:
+                con.close()
+            assert "tests" in analyzed
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.unlink(db_path + suffix)